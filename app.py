@@ -1,5 +1,27 @@
+import hmac
+import math
+import os
+import time
+from pathlib import Path
+
 import streamlit as st
-import pandas as pd
+
+from gitdict.corpus import CorpusRegistry
+from gitdict.export import EXPORT_FORMATS
+from gitdict.feedback_store import RATINGS, FeedbackStore
+from gitdict.highlight import escape_markdown, list_label, markdown_snippet
+from gitdict.memo_store import GLOBAL_NOTE_KEY, MemoStore
+from gitdict.pagination import paginate
+from gitdict.perf import NULL_TIMER, RerunProfiler
+from gitdict.quiz_store import QuizStore
+from gitdict.storage import (
+    STATE_DIR,
+    anonymous_user_id,
+    is_persistent,
+    issue_owner_token,
+    user_id_from_token,
+)
+from gitdict.theme import CSS, WORKFLOW_STEPS, workflow_step_html
 
 # ==============================
 # ページ設定
@@ -11,288 +33,150 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
+
+# ==============================
+# 再実行の計測（GITDICT_PROFILE=1 または ?debug=1 のときだけ有効）
+# ==============================
+@st.cache_resource
+def get_profiler():
+    return RerunProfiler(
+        metrics_path=Path(
+            os.environ.get("GITDICT_METRICS_FILE", STATE_DIR / "rerun_metrics.jsonl")
+        )
+    )
+
+
+if "debug" not in st.session_state:
+    # ?debug=1 は最初の再実行で読むだけにする（URL からは後で取り除く）
+    st.session_state.debug = st.query_params.get("debug") == "1"
+PROFILING = os.environ.get("GITDICT_PROFILE") == "1" or st.session_state.debug
+timer = get_profiler().start() if PROFILING else NULL_TIMER
+
 # ==============================
 # カスタムCSS（見た目用のみ）
 # ==============================
-st.markdown(
-    """
-<style>
-.block-container {
-    max-width: 1600px;
-}
-
-/* 情報ボックス */
-.info-box {
-    padding: 1rem;
-    border-radius: 0.5rem;
-    margin-bottom: 1rem;
-}
-.info-box.blue {
-    background-color: #eff6ff;
-    border: 1px solid #bfdbfe;
-}
-.info-box.green {
-    background-color: #f0fdf4;
-    border: 1px solid #bbf7d0;
-}
-.info-box.purple {
-    background-color: #faf5ff;
-    border: 1px solid #e9d5ff;
-}
-.info-box.amber {
-    background-color: #fffbeb;
-    border: 1px solid #fde68a;
-}
-
-/* タグ */
-.tag {
-    display: inline-block;
-    padding: 0.25rem 0.75rem;
-    background-color: #eff6ff;
-    color: #2563eb;
-    border-radius: 0.25rem;
-    font-size: 0.875rem;
-    margin-bottom: 0.75rem;
-}
-
-/* カテゴリーヘッダー */
-.category-header {
-    color: #6b7280;
-    font-size: 0.875rem;
-    font-weight: 600;
-    margin-top: 1.5rem;
-    margin-bottom: 0.5rem;
-}
-
-/* ワークフローステップ */
-.workflow-step {
-    display: flex;
-    gap: 0.75rem;
-    margin-bottom: 0.75rem;
-}
-.step-number {
-    width: 1.5rem;
-    height: 1.5rem;
-    background-color: #dbeafe;
-    color: #2563eb;
-    border-radius: 50%;
-    display: flex;
-    align-items: center;
-    justify-content: center;
-    font-size: 0.875rem;
-    flex-shrink: 0;
-}
-</style>
-""",
-    unsafe_allow_html=True,
-)
+st.markdown(f"<style>{CSS}</style>", unsafe_allow_html=True)
+timer.lap("css")
 
 # ==============================
 # 用語データ
 # ==============================
-TERMS = [
-    {
-        "id": "repository",
-        "name": "リポジトリ (Repository)",
-        "category": "基本概念",
-        "short_description": "プロジェクトのファイルと履歴を保存する場所",
-        "full_description": "リポジトリは、Gitでプロジェクトを管理するための保管場所です。ファイルやディレクトリの状態を記録し、その変更履歴を保存します。ローカルリポジトリ（自分のPC上）とリモートリポジトリ（GitHubなどのサーバー上）の2種類があります。",
-        "examples": [
-            "git init でローカルリポジトリを作成",
-            "git clone でリモートリポジトリを複製",
-        ],
-        "related_terms": ["commit", "clone", "remote"],
-    },
-    {
-        "id": "commit",
-        "name": "コミット (Commit)",
-        "category": "基本操作",
-        "short_description": "変更を記録すること",
-        "full_description": "コミットは、ファイルの変更をリポジトリに記録する操作です。スナップショットのように、その時点のプロジェクトの状態を保存します。各コミットには一意のIDが付与され、いつでもその状態に戻ることができます。コミットメッセージを付けることで、何を変更したかを記録できます。",
-        "examples": [
-            "git add . で変更をステージング",
-            'git commit -m "メッセージ" でコミット',
-        ],
-        "related_terms": ["staging", "push", "log"],
-    },
-    {
-        "id": "branch",
-        "name": "ブランチ (Branch)",
-        "category": "基本概念",
-        "short_description": "作業を分岐させる機能",
-        "full_description": "ブランチは、開発作業を本流から分岐させる機能です。新機能の開発やバグ修正を、メインの開発ラインに影響を与えずに行えます。作業が完了したら、マージして本流に統合します。複数人での並行開発に不可欠な機能です。",
-        "examples": [
-            "git branch feature/new-feature で新しいブランチ作成",
-            "git checkout -b feature/new-feature でブランチ作成と切り替えを同時に実行",
-        ],
-        "related_terms": ["merge", "checkout", "main"],
-    },
-    {
-        "id": "merge",
-        "name": "マージ (Merge)",
-        "category": "基本操作",
-        "short_description": "ブランチを統合すること",
-        "full_description": "マージは、異なるブランチの変更を統合する操作です。feature ブランチでの開発が完了したら、main ブランチにマージして変更を反映させます。自動的に統合できない場合はコンフリクトが発生し、手動で解決する必要があります。",
-        "examples": [
-            "git merge feature/new-feature で現在のブランチにマージ",
-            "git merge --no-ff でマージコミットを必ず作成",
-        ],
-        "related_terms": ["branch", "conflict", "rebase"],
-    },
-    {
-        "id": "push",
-        "name": "プッシュ (Push)",
-        "category": "基本操作",
-        "short_description": "ローカルの変更をリモートに送信",
-        "full_description": "プッシュは、ローカルリポジトリのコミットをリモートリポジトリに送信する操作です。これにより、他の開発者と変更を共有できます。プッシュする前に、リモートの最新状態を取得（pull）することが推奨されます。",
-        "examples": [
-            "git push origin main でmainブランチをプッシュ",
-            "git push -u origin feature でブランチを初回プッシュ",
-        ],
-        "related_terms": ["pull", "remote", "commit"],
-    },
-    {
-        "id": "pull",
-        "name": "プル (Pull)",
-        "category": "基本操作",
-        "short_description": "リモートの変更をローカルに取り込む",
-        "full_description": "プルは、リモートリポジトリの変更をローカルリポジトリに取り込む操作です。fetch（取得）とmerge（統合）を同時に行います。チーム開発では、作業開始前に必ずpullして最新状態にすることが重要です。",
-        "examples": [
-            "git pull origin main でリモートの変更を取得",
-            "git pull --rebase でリベースしながら取得",
-        ],
-        "related_terms": ["push", "fetch", "merge"],
-    },
-    {
-        "id": "clone",
-        "name": "クローン (Clone)",
-        "category": "基本操作",
-        "short_description": "リモートリポジトリを複製",
-        "full_description": "クローンは、リモートリポジトリ全体をローカルにコピーする操作です。GitHubなどからプロジェクトをダウンロードして開発を始める際に使用します。履歴も含めて完全にコピーされます。",
-        "examples": [
-            "git clone https://github.com/user/repo.git",
-            "git clone git@github.com:user/repo.git でSSH経由でクローン",
-        ],
-        "related_terms": ["repository", "remote", "fetch"],
-    },
-    {
-        "id": "staging",
-        "name": "ステージング (Staging)",
-        "category": "基本概念",
-        "short_description": "コミット対象を準備するエリア",
-        "full_description": "ステージングエリア（インデックス）は、次のコミットに含める変更を準備する場所です。git addコマンドでファイルをステージングし、git commitで実際にコミットします。この仕組みにより、変更の一部だけをコミットすることができます。",
-        "examples": [
-            "git add file.txt で特定のファイルをステージング",
-            "git add . ですべての変更をステージング",
-            "git reset HEAD file.txt でステージングを取り消し",
-        ],
-        "related_terms": ["commit", "add", "status"],
-    },
-    {
-        "id": "conflict",
-        "name": "コンフリクト (Conflict)",
-        "category": "トラブルシューティング",
-        "short_description": "変更が競合している状態",
-        "full_description": "コンフリクトは、同じファイルの同じ箇所を異なる方法で変更した際に発生します。Gitが自動的にマージできない場合、手動で解決する必要があります。コンフリクトマーカー（<<<<<<<, =======, >>>>>>>）が挿入されるので、どちらの変更を採用するか決定します。",
-        "examples": [
-            "コンフリクトマーカーを確認",
-            "必要な変更を残して不要な部分を削除",
-            "git add で解決済みをマーク",
-            "git commit でマージを完了",
-        ],
-        "related_terms": ["merge", "rebase", "diff"],
-    },
-    {
-        "id": "remote",
-        "name": "リモート (Remote)",
-        "category": "基本概念",
-        "short_description": "リモートリポジトリへの参照",
-        "full_description": "リモートは、ネットワーク上のリポジトリへの参照です。通常「origin」という名前が付けられます。複数のリモートを設定することも可能で、チーム開発では必須の概念です。",
-        "examples": [
-            "git remote -v でリモート一覧を表示",
-            "git remote add origin <URL> でリモートを追加",
-            "git remote rename old new で名前変更",
-        ],
-        "related_terms": ["push", "pull", "clone"],
-    },
-    {
-        "id": "fetch",
-        "name": "フェッチ (Fetch)",
-        "category": "基本操作",
-        "short_description": "リモートの情報を取得（マージはしない）",
-        "full_description": "フェッチは、リモートリポジトリの最新情報を取得しますが、ローカルのブランチには自動的にマージしません。pullと異なり、安全に確認してからマージできます。",
-        "examples": [
-            "git fetch origin でリモートの情報を取得",
-            "git fetch --all ですべてのリモートから取得",
-        ],
-        "related_terms": ["pull", "remote", "merge"],
-    },
-    {
-        "id": "rebase",
-        "name": "リベース (Rebase)",
-        "category": "応用操作",
-        "short_description": "コミット履歴を整理",
-        "full_description": "リベースは、コミット履歴を別のベース上に付け替える操作です。mergeと異なり、履歴を一直線に保つことができます。ただし、既に共有されているコミットには使用すべきではありません。",
-        "examples": [
-            "git rebase main で現在のブランチをmainの最新に付け替え",
-            "git rebase -i HEAD~3 で対話的にコミットを整理",
-        ],
-        "related_terms": ["merge", "commit", "interactive"],
-    },
-    {
-        "id": "stash",
-        "name": "スタッシュ (Stash)",
-        "category": "応用操作",
-        "short_description": "作業中の変更を一時退避",
-        "full_description": "スタッシュは、コミットせずに作業中の変更を一時的に退避させる機能です。ブランチを切り替える必要があるが、まだコミットしたくない場合に便利です。",
-        "examples": [
-            "git stash で変更を退避",
-            "git stash pop で退避した変更を復元",
-            "git stash list で退避一覧を表示",
-        ],
-        "related_terms": ["commit", "checkout", "branch"],
-    },
-    {
-        "id": "tag",
-        "name": "タグ (Tag)",
-        "category": "応用操作",
-        "short_description": "特定のコミットに印をつける",
-        "full_description": "タグは、特定のコミットに名前をつけて記録する機能です。主にリリースバージョンを記録するために使用されます（v1.0.0など）。軽量タグと注釈付きタグの2種類があります。",
-        "examples": [
-            "git tag v1.0.0 で軽量タグを作成",
-            'git tag -a v1.0.0 -m "Release 1.0" で注釈付きタグ',
-            "git push origin v1.0.0 でタグをプッシュ",
-        ],
-        "related_terms": ["commit", "release", "version"],
-    },
-    {
-        "id": "checkout",
-        "name": "チェックアウト (Checkout)",
-        "category": "基本操作",
-        "short_description": "ブランチやコミットを切り替える",
-        "full_description": "チェックアウトは、作業するブランチを切り替えたり、過去のコミットの状態を確認したりする操作です。Git 2.23以降では、switch（ブランチ切り替え）とrestore（ファイル復元）に分割されました。",
-        "examples": [
-            "git checkout main でmainブランチに切り替え",
-            "git checkout -b new-branch で新ブランチ作成と切り替え",
-            "git checkout <commit-id> で特定のコミットを確認",
-        ],
-        "related_terms": ["branch", "switch", "restore"],
-    },
-]
-
-CATEGORIES = ["基本概念", "基本操作", "応用操作", "トラブルシューティング"]
+@st.cache_resource
+def get_corpus_registry():
+    # プロセスごとに1つ。ロケールごとのコーパスを初めて選ばれたときに読み込み、
+    # ソースが更新されたら新しいバージョンに差し替える
+    return CorpusRegistry()
+
+
+@st.cache_resource
+def get_memo_store():
+    # メモの書き込みはプロセス内でまとめて行う
+    return MemoStore(STATE_DIR / "memos.sqlite3")
+
+
+@st.cache_resource
+def get_feedback_store():
+    # フィードバックはバックグラウンドのスレッドがまとめて書き込む
+    return FeedbackStore(STATE_DIR / "feedback.sqlite3")
+
+
+@st.cache_resource
+def get_quiz_store():
+    # クイズの学習状態（ユーザーごとの復習キュー）
+    return QuizStore(STATE_DIR / "quiz.sqlite3")
+
+
+# セレクタに出すロケールの表示名（ここにないロケールはコードのまま表示）
+LOCALE_NAMES = {"ja": "日本語", "en": "English"}
+
+corpus_registry = get_corpus_registry()
+# 表示名 -> ロケール
+LOCALE_BY_LABEL = {LOCALE_NAMES.get(code, code): code for code in corpus_registry.locales}
+
+if "locale_label" not in st.session_state:
+    lang_param = st.query_params.get("lang")
+    if lang_param not in corpus_registry.locales:
+        lang_param = corpus_registry.locales[0]
+    st.session_state.locale_label = LOCALE_NAMES.get(lang_param, lang_param)
+
+with st.sidebar:
+    # 用語データの言語（名前・説明・使用例がその言語版になる）
+    locale_label = st.selectbox(
+        "🌐 言語 / Language",
+        options=list(LOCALE_BY_LABEL),
+        key="locale_label",
+        disabled=len(LOCALE_BY_LABEL) < 2,
+    )
+locale = LOCALE_BY_LABEL[locale_label]
+
+# この再実行の間は同じスナップショットを使う（途中で差し替わっても混ざらない）
+corpus = corpus_registry.current(locale)
+store = corpus.store
+facets = corpus.facets
+CATEGORIES = list(store.categories)
 
 # ==============================
 # セッション状態
 # ==============================
+def sync_query_param(name, value, default):
+    """URL のクエリパラメータを value に合わせる（既定値なら外す。変わらなければ触らない）。"""
+    if value == default:
+        if name in st.query_params:
+            del st.query_params[name]
+    elif st.query_params.get(name) != value:
+        st.query_params[name] = value
+
+
+# URL のクエリパラメータ（共有したリンクで同じ画面を開けるようにする）
+#   term: 選択中の用語 / q: 検索語 / cat: カテゴリフィルタ / adv=0: 応用を含めない
+#   lang: 用語データの言語
+SHARED_QUERY_PARAMS = ("term", "q", "cat", "adv", "lang")
+
+sync_query_param("lang", locale, corpus_registry.locales[0])
+
 if "selected_term_id" not in st.session_state:
-    st.session_state.selected_term_id = "repository"
+    term_param = st.query_params.get("term")
+    st.session_state.selected_term_id = (
+        term_param if term_param in store else "repository"
+    )
 
 if "search_query" not in st.session_state:
-    st.session_state.search_query = ""
+    st.session_state.search_query = st.query_params.get("q", "")
+
+if "category_filter" not in st.session_state:
+    cat_param = st.query_params.get("cat")
+    st.session_state.category_filter = cat_param if cat_param in CATEGORIES else "すべて"
+
+if "include_advanced" not in st.session_state:
+    st.session_state.include_advanced = st.query_params.get("adv") != "0"
+
+if "user_id" not in st.session_state:
+    # メモ・クイズの記録の持ち主。既定ではこのセッションだけの（保存しない）id で、
+    # サイドバーで保存用のキーを発行・入力したときだけキーから決まる id に切り替える。
+    # URL には載せない（共有したリンクから他人のメモを開けてしまうので）
+    st.session_state.user_id = anonymous_user_id()
+    st.session_state.owner_token = None
+    st.session_state.owner_error = None
+
+if "is_admin" not in st.session_state:
+    # 管理者の合言葉（?admin=）は最初の再実行で照合するだけにする
+    admin_token = os.environ.get("GITDICT_ADMIN_TOKEN")
+    st.session_state.is_admin = bool(admin_token) and hmac.compare_digest(
+        st.query_params.get("admin", "").encode(), admin_token.encode()
+    )
+
+# 共有してよい項目以外（?admin=・?debug=、以前の版が付けていた uid など）は
+# URL から取り除く（リンクを共有したときに合言葉が漏れないように）
+for name in list(st.query_params):
+    if name not in SHARED_QUERY_PARAMS:
+        del st.query_params[name]
+
+memo_store = get_memo_store()
+
+if "list_page" not in st.session_state:
+    st.session_state.list_page = 0  # 用語一覧の表示ページ（0 始まり）
 
-if "term_memos" not in st.session_state:
-    st.session_state.term_memos = {}  # term_id -> memo text
+timer.lap("load")
 
 
 # ==============================
@@ -309,12 +193,88 @@ with top_col1:
     )
 
 with top_col2:
-    total_terms = len(TERMS)
-    total_categories = len(set(t["category"] for t in TERMS))
+    total_terms = facets.total
+    total_categories = len(facets.non_empty_categories())
     st.metric("登録用語数", total_terms)
     st.metric("カテゴリ数", total_categories)
 
 st.info("💡 左のサイドバーから表示モードやフィルタ条件を変更できます。")
+timer.lap("header")
+
+
+# ==============================
+# ウィジェットのコールバック
+# ==============================
+def select_term(term_id):
+    st.session_state.selected_term_id = term_id
+
+
+def go_to_page():
+    st.session_state.list_page = st.session_state.list_page_input - 1
+
+
+def save_memo(key, widget_key):
+    memo_store.set(st.session_state.user_id, key, st.session_state[widget_key])
+
+
+def switch_owner(user_id, token):
+    st.session_state.user_id = user_id
+    st.session_state.owner_token = token
+    st.session_state.owner_error = None
+    # 前の持ち主のメモ・問題が入力欄に残らないようにウィジェットの状態を捨てる
+    for key in list(st.session_state):
+        if key == "global_note" or (key.startswith("memo_") and key != "memo_query"):
+            del st.session_state[key]
+    next_quiz()
+
+
+def issue_owner():
+    token = issue_owner_token()
+    user_id = user_id_from_token(token)
+    # このセッションで書いたメモ・クイズの記録を引き継いで保存する
+    memo_store.adopt(st.session_state.user_id, user_id)
+    get_quiz_store().adopt(st.session_state.user_id, user_id)
+    switch_owner(user_id, token)
+
+
+def open_owner():
+    token = st.session_state.owner_token_input.strip()
+    st.session_state.owner_token_input = ""
+    if not token:
+        return
+    try:
+        user_id = user_id_from_token(token)
+    except ValueError as e:
+        st.session_state.owner_error = str(e)
+        return
+    switch_owner(user_id, token)
+
+
+def forget_owner():
+    switch_owner(anonymous_user_id(), None)
+
+
+def answer_quiz(choice):
+    question = st.session_state.quiz_question
+    st.session_state.quiz_choice = choice
+    get_quiz_store().record(
+        st.session_state.user_id, question.term_id, choice == question.answer
+    )
+
+
+def next_quiz():
+    st.session_state.quiz_question = None
+    st.session_state.quiz_choice = None
+
+
+# ==============================
+# 部分的な再実行の単位（フラグメント）
+# ==============================
+# クイズ・辞書ビュー（一覧＋詳細）・メモ・一覧表をそれぞれフラグメントにして、
+# その中の操作ではそのまとまりだけを再実行する。CSS や「Gitとは」などの
+# 静的な部分は全体の再実行のときにしか出力されない。
+# フラグメントの中で呼ぶフラグメント（詳細ペインのメモ）は、さらにその中だけを
+# 再実行する（st.fragment は Streamlit 1.37 から。requirements.txt で固定）。
 
 
 # ==============================
@@ -323,33 +283,58 @@ st.info("💡 左のサイドバーから表示モードやフィルタ条件を
 with st.sidebar:
     st.subheader("⚙ 表示設定")
 
-    mode = st.radio("学習モード", options=["辞書モード", "クイズ準備中"], index=0)
+    mode = st.radio("学習モード", options=["辞書モード", "クイズモード"], index=0)
 
+    # コーパスの更新でカテゴリが消えたら「すべて」に戻す
+    if st.session_state.category_filter not in ["すべて"] + CATEGORIES:
+        st.session_state.category_filter = "すべて"
     category_filter = st.selectbox(
         "カテゴリフィルタ",
         options=["すべて"] + CATEGORIES,
-        index=0,
+        key="category_filter",
     )
 
-    include_advanced = st.checkbox("応用操作・トラブルシューティングも含める", value=True)
-
-    max_items = st.slider("最大表示件数", min_value=5, max_value=50, value=20, step=5)
-
-    st.markdown("---")
-    st.caption("選択中の用語に対する自分用メモ")
+    include_advanced = st.checkbox(
+        "応用操作・トラブルシューティングも含める", key="include_advanced"
+    )
 
-    current_id = st.session_state.selected_term_id
-    current_memo = st.session_state.term_memos.get(current_id, "")
+    # カテゴリ別のヒット件数（絞り込み後に埋める）
+    facet_counts_slot = st.empty()
 
-    memo_text = st.text_area(
-        "この用語の社内での使い方・注意点",
-        value=current_memo,
-        height=120,
+    max_items = st.select_slider(
+        "最大表示件数",
+        options=[5, 10, 20, 50, 100, 500, "すべて"],
+        value=20,
     )
-    st.session_state.term_memos[current_id] = memo_text
+    if max_items == "すべて":
+        max_items = None
+
+    st.markdown("---")
+    st.caption("🔑 メモ・クイズの記録")
+    if st.session_state.owner_token is None:
+        st.caption("いまの記録はこのセッションの中だけで、閉じると消えます。")
+        st.button("保存用のキーを発行する", key="issue_owner", on_click=issue_owner)
+        st.text_input(
+            "保存用のキーで開く",
+            type="password",
+            key="owner_token_input",
+            on_change=open_owner,
+            help="以前に発行したキーを入れると、その記録を開きます。",
+        )
+        if st.session_state.owner_error:
+            st.error(st.session_state.owner_error)
+    else:
+        st.code(st.session_state.owner_token, language=None)
+        st.caption(
+            "このキーを控えておくと、別の端末や次回の訪問でも同じ記録を開けます。"
+            "キーを知っている人は誰でも記録を読み書きできるので、人には教えないでください。"
+        )
+        st.button("このセッションだけの記録に戻す", key="forget_owner", on_click=forget_owner)
 
     st.markdown("---")
-    st.caption("このアプリについてのフィードバック（ダミー）")
+    st.caption("このアプリについてのフィードバック")
+
+    feedback_store = get_feedback_store()
 
     with st.form("feedback_form"):
         name = st.text_input("お名前（任意）")
@@ -357,8 +342,108 @@ with st.sidebar:
         comment = st.text_area("コメント", height=80)
         submitted = st.form_submit_button("送信")
         if submitted:
+            # 書き込みキューに積むだけなので再実行は待たされない
+            user_id = st.session_state.user_id
+            feedback_store.submit(
+                name, rating, comment, user_id if is_persistent(user_id) else None
+            )
             st.success("フィードバックありがとうございます！")
 
+    # 管理者向けの集計（GITDICT_ADMIN_TOKEN と同じ ?admin= を付けて開いたセッションだけ表示）
+    if st.session_state.is_admin:
+        summary = feedback_store.summary()
+        with st.expander("📈 フィードバック集計（管理者）"):
+            st.metric("件数", summary.count)
+            st.metric(
+                "平均評価",
+                "-" if summary.mean is None else f"{summary.mean:.2f}",
+            )
+            st.bar_chart(
+                {
+                    "評価": list(RATINGS),
+                    "件数": [summary.histogram[r] for r in RATINGS],
+                },
+                x="評価",
+                y="件数",
+            )
+
+timer.lap("sidebar")
+
+
+# ==============================
+# クイズ（クイズモードのときだけ）
+# ==============================
+@st.fragment
+def render_quiz():
+    quiz_store = get_quiz_store()
+    quiz_queue = quiz_store.queue(st.session_state.user_id)
+    question_bank = corpus.question_bank
+
+    if "quiz_question" not in st.session_state:
+        st.session_state.quiz_question = None
+        st.session_state.quiz_choice = None
+
+    # 回答するまでは同じ問題を出し続ける。問題はどの Corpus で作ったかと組で持ち、
+    # 言語の切り替えやコーパスの更新のあとは同じ用語・種類の問題を作り直す
+    # （読み込み直したロケールは version が 1 から数え直すので内容のハッシュも見る）
+    question = st.session_state.quiz_question
+    question_key = (locale, corpus.version, store.version)
+    if question is not None and st.session_state.get("quiz_question_key") != question_key:
+        if (
+            st.session_state.quiz_choice is None
+            and question.term_id in store
+            and question.kind in question_bank.kinds(question.term_id)
+        ):
+            question = question_bank.question(question.term_id, question.kind)
+        else:
+            # 消えた用語と、選択肢の並びが変わりうる回答済みの問題は次の問題に進む
+            question = None
+    st.session_state.quiz_question_key = question_key
+    if question is None:
+        st.session_state.quiz_choice = None
+        term_id = quiz_queue.next_card(store)
+        if term_id is None:
+            question = None
+        else:
+            state = quiz_queue.states.get(term_id)
+            kinds = question_bank.kinds(term_id)
+            turn = 0 if state is None else state.reps + state.lapses
+            question = question_bank.question(term_id, kinds[turn % len(kinds)])
+    st.session_state.quiz_question = question
+
+    with st.container(border=True):
+        st.subheader("🎯 クイズ")
+        st.caption(f"学習済み {len(quiz_queue)} / {len(store)} 語")
+        if question is None:
+            next_due = quiz_queue.next_due(store)
+            minutes = 1 if next_due is None else max(1, math.ceil((next_due - time.time()) / 60))
+            st.success(f"🎉 いま復習する用語はありません。次の復習は約 {minutes} 分後です。")
+            st.button("🔄 もう一度確認する", key="quiz_refresh")
+        else:
+            st.markdown(f"**{question.prompt}**")
+            choice = st.session_state.quiz_choice
+            for i, (_, label) in enumerate(question.choices):
+                st.button(
+                    label,
+                    key=f"quiz_choice_{i}",
+                    on_click=answer_quiz,
+                    args=(i,),
+                    disabled=choice is not None,
+                    use_container_width=True,
+                )
+            if choice is not None:
+                answer_term = store.get(question.term_id)
+                if choice == question.answer:
+                    st.success(f"⭕ 正解！ {answer_term.name}")
+                else:
+                    st.error(f"❌ 不正解… 正解は「{question.choices[question.answer][1]}」")
+                st.button("次の問題へ ▶", key="quiz_next", on_click=next_quiz)
+
+
+if mode == "クイズモード":
+    render_quiz()
+    timer.lap("quiz")
+
 
 # ==============================
 # 検索バー
@@ -368,43 +453,357 @@ search_col1, search_col2 = st.columns([3, 1])
 with search_col1:
     search_query = st.text_input(
         "🔍 用語を検索...",
-        value=st.session_state.search_query,
-        placeholder="用語名や一言説明で検索",
+        placeholder="用語名・説明・使用例で検索",
+        key="search_query",
     )
-    st.session_state.search_query = search_query
 
 with search_col2:
-    st.caption("※ 大文字小文字は区別されません")
+    st.caption("※ 大文字小文字・全角半角・ひらがなとカタカナは区別されません")
+
+# 入力中の語で始まる用語の候補（押すとその用語を直接開く）
+suggestions = corpus.autocomplete.complete(search_query, k=5)
+if suggestions:
+    suggestion_cols = st.columns(len(suggestions))
+    for col, suggestion in zip(suggestion_cols, suggestions):
+        term = store.terms[suggestion.position]
+        with col:
+            st.button(
+                f"🔎 {term.name}",
+                key=f"suggest_{term.id}",
+                on_click=select_term,
+                args=(term.id,),
+                use_container_width=True,
+            )
+
+timer.lap("search_bar")
 
 
 # ==============================
 # 用語フィルタリング
 # ==============================
-filtered_terms = TERMS
+# カテゴリ → 応用除外 → 検索 → 件数制限 をまとめてキャッシュ付きで実行する
+filter_result = corpus.filter_cache(
+    None if category_filter == "すべて" else category_filter,
+    include_advanced,
+    search_query,
+    max_items,
+)
+
+# 絞り込み条件を URL に反映する（選択中の用語は詳細ペインで反映する）
+sync_query_param("q", search_query.strip(), "")
+sync_query_param("cat", category_filter, "すべて")
+sync_query_param("adv", "1" if include_advanced else "0", "1")
+
+facet_counts_slot.caption(
+    " / ".join(
+        f"{category}: {count}件"
+        for category, count in filter_result.category_counts.items()
+    )
+)
+timer.lap("filter")
+
+
+# ==============================
+# 辞書ビュー・メモ・一覧表のフラグメント
+# ==============================
+@st.fragment
+def render_term_memo(term_id):
+    """選択中の用語に対する自分用メモ（入力してもメモ欄だけが再実行される）。"""
+    st.markdown("#### ✏ 自分用メモ")
+    # 変更があったときだけ保存する（書き込みはメモストア側でまとめて行う）
+    st.text_area(
+        "この用語の社内での使い方・注意点",
+        value=memo_store.get(st.session_state.user_id, term_id),
+        height=120,
+        key=f"memo_{term_id}",
+        on_change=save_memo,
+        args=(term_id, f"memo_{term_id}"),
+    )
+    if st.session_state.owner_token is None:
+        st.caption("※ 次回も開くには、サイドバーで保存用のキーを発行しておいてください。")
+
+
+def render_term_list(filter_result, page_key):
+    st.subheader("📋 用語一覧")
+    st.caption(f"{filter_result.total} 件ヒット（{len(filter_result.positions)} 件表示）")
+
+    # ★ ラジオは「表示順の切り替え」にだけ使う（機能カウント用にもなる）
+    list_mode = st.radio(
+        "表示順",
+        options=["カテゴリ別", "名前順（五十音）", "名前順（ABC）"],
+        horizontal=True,
+        key="list_mode",
+    )
+
+    page_size = st.selectbox(
+        "1ページの表示件数",
+        options=[10, 20, 50, 100],
+        index=1,
+        key="page_size",
+    )
+
+    # 並び順はコーパス読み込み時に計算済みの順列で並べる（再実行ごとの文字列ソートなし）
+    if list_mode == "名前順（五十音）":
+        view_positions = corpus.collation.ordered(filter_result.positions, "reading")
+    elif list_mode == "名前順（ABC）":
+        view_positions = corpus.collation.ordered(filter_result.positions, "english")
+    elif search_query.strip():
+        # 検索中はカテゴリ内で関連度の順を保つ
+        view_positions = facets.order_by_category(filter_result.positions)
+    else:
+        view_positions = corpus.collation.ordered(filter_result.positions, "category")
+
+    # 絞り込み条件や並び順が変わったら1ページ目に戻す
+    page_key = page_key + (list_mode, page_size)
+    if st.session_state.get("list_page_key") != page_key:
+        st.session_state.list_page_key = page_key
+        st.session_state.list_page = 0
+
+    page = paginate(len(view_positions), st.session_state.list_page, page_size)
+
+    # 表示中のページ分だけボタンを作る（キーは用語IDなのでページをまたいでも安定）
+    current_category = None
+    for pos in view_positions[page.start : page.stop]:
+        term = store.terms[pos]
+        if list_mode == "カテゴリ別" and term.category != current_category:
+            current_category = term.category
+            st.markdown(
+                f"<div class='category-header'>{current_category}"
+                f"（{filter_result.category_counts[current_category]}件）</div>",
+                unsafe_allow_html=True,
+            )
+
+        # 一致箇所は検索時に求めたオフセットから切り出す（ここでは照合し直さない）
+        st.button(
+            list_label(term, filter_result.matches.get(pos)),
+            key=f"term_{term.id}",
+            use_container_width=True,
+            on_click=select_term,
+            args=(term.id,),
+        )
+
+    # ページ送り（フラグメントの中では列をこれ以上入れ子にできないので ± 付きの数値入力）
+    if page.count > 1:
+        st.number_input(
+            f"ページ（全 {page.count} ページ）",
+            min_value=1,
+            max_value=page.count,
+            value=page.number + 1,
+            step=1,
+            key="list_page_input",
+            on_change=go_to_page,
+        )
+
+
+def render_term_detail(filter_result):
+    selected_term = store.get(st.session_state.selected_term_id, store.terms[0])
+
+    sync_query_param("term", selected_term.id, "repository")
+
+    st.subheader("📖 用語詳細")
+
+    # タグ・説明・使用例は (コーパスの版, 用語, 一致位置) ごとに組み立て済みのものを使う
+    matches = filter_result.matches.get(store.position(selected_term.id))
+    st.markdown(corpus.detail_cache(selected_term.id, matches), unsafe_allow_html=True)
+
+    related_graph = corpus.related_graph
+    related_ids = related_graph.neighbors(selected_term.id)
+    missing_ids = related_graph.missing_links(selected_term.id)
+    if related_ids or missing_ids:
+        st.markdown("#### 🔗 関連用語")
+        for rid in related_ids:
+            rt = store.get(rid)
+            st.button(
+                f"{rt.name}：{rt.short_description}",
+                key=f"related_{rid}",
+                on_click=select_term,
+                args=(rid,),
+            )
+        if missing_ids:
+            st.caption("未登録の関連用語： " + ", ".join(missing_ids))
+
+    # 説明文の TF-IDF が近い用語（コーパス読み込み時にバックグラウンドで上位 k 件を計算する）
+    similarity = corpus.similarity_if_ready()
+    if similarity is None:
+        st.caption("🧭 似ている用語を計算しています…")
+        similar = []
+    else:
+        similar = [
+            (sid, score)
+            for sid, score in similarity.neighbors(selected_term.id)
+            if sid not in related_ids
+        ]
+    if similar:
+        st.markdown("#### 🧭 似ている用語")
+        for sid, score in similar:
+            st.button(
+                f"{store.get(sid).name}（類似度 {score:.2f}）",
+                key=f"similar_{sid}",
+                on_click=select_term,
+                args=(sid,),
+            )
+
+    referrer_ids = related_graph.referenced_by(selected_term.id)
+    if referrer_ids:
+        st.markdown("#### 🔙 この用語を参照している用語")
+        for rid in referrer_ids:
+            rt = store.get(rid)
+            st.button(
+                f"{rt.name}：{rt.short_description}",
+                key=f"referrer_{rid}",
+                on_click=select_term,
+                args=(rid,),
+            )
+
+    if related_ids:
+        with st.expander("🕸 関連用語をたどる"):
+            max_hops = st.slider("たどる段数", 1, 4, 2, key="related_hops")
+            for layer in related_graph.neighborhood(selected_term.id, max_hops):
+                st.caption(f"{layer.hops} 段先（{len(layer.ids)}件）")
+                for rid in layer.ids:
+                    st.button(
+                        store.get(rid).name,
+                        key=f"hop_{rid}",
+                        on_click=select_term,
+                        args=(rid,),
+                    )
+
+    st.markdown("---")
+    render_term_memo(selected_term.id)
+    st.info(
+        "💬 メモを残しておくと、自分用のGitリファレンスとして育てることができます。"
+    )
+
+
+@st.fragment
+def render_dictionary(filter_result, page_key):
+    """用語一覧と用語詳細。用語を選ぶと両方が変わるので1つのフラグメントにまとめる。"""
+    col_mid, col_right = st.columns([1.2, 2])
+    with col_mid:
+        render_term_list(filter_result, page_key)
+    with col_right:
+        render_term_detail(filter_result)
+
+
+@st.fragment
+def render_table(filter_key, positions):
+    """一覧表とダウンロード（形式の切り替えなどでは一覧表だけが再実行される）。"""
+    st.subheader("📊 用語一覧（表形式）")
+
+    export_cache = corpus.export_cache
+    df = export_cache.table(filter_key, positions)
 
-# カテゴリフィルタ
-if category_filter != "すべて":
-    filtered_terms = [t for t in filtered_terms if t["category"] == category_filter]
+    st.dataframe(df, use_container_width=True)
+
+    export_col1, export_col2 = st.columns(2)
+    with export_col1:
+        export_format = st.radio(
+            "ファイル形式",
+            options=list(EXPORT_FORMATS),
+            horizontal=True,
+            key="export_format",
+        )
+    with export_col2:
+        export_scope = st.radio(
+            "ダウンロード範囲",
+            options=["絞り込み結果", "全用語"],
+            horizontal=True,
+            key="export_scope",
+        )
 
-# 応用・トラブルの除外
-if not include_advanced:
-    filtered_terms = [
-        t
-        for t in filtered_terms
-        if t["category"] not in ("応用操作", "トラブルシューティング")
-    ]
+    # ダウンロード用データは押されたときにだけ作る（作成済みのものはキャッシュから返す）
+    export_request = (filter_key, export_format, export_scope)
+    if st.button("📦 ダウンロード用データを作成", key="export_prepare"):
+        st.session_state.export_request = export_request
+
+    if st.session_state.get("export_request") == export_request:
+        ext, mime = EXPORT_FORMATS[export_format]
+        if export_scope == "全用語":
+            with open(export_cache.full_export_path(export_format), "rb") as f:
+                st.download_button(
+                    label=f"📥 全用語を{export_format}でダウンロード",
+                    data=f,
+                    file_name=f"git_terms_all.{ext}",
+                    mime=mime,
+                )
+        else:
+            st.download_button(
+                label=f"📥 この一覧を{export_format}でダウンロード",
+                data=export_cache.payload(filter_key, positions, export_format),
+                file_name=f"git_terms.{ext}",
+                mime=mime,
+            )
+
+    st.caption("※ 「絞り込み結果」は絞り込み条件・検索結果に応じた内容がダウンロードされます。")
 
-# 検索フィルタ
-if search_query:
-    q = search_query.lower()
-    filtered_terms = [
-        t
-        for t in filtered_terms
-        if q in t["name"].lower() or q in t["short_description"].lower()
-    ]
+    unresolved = corpus.related_graph.unresolved
+    if unresolved:
+        with st.expander(f"⚠ 未登録の関連用語（{len(unresolved)}件）"):
+            st.dataframe(
+                [
+                    {"未登録ID": missing_id, "参照元": ", ".join(sources)}
+                    for missing_id, sources in unresolved.items()
+                ],
+                use_container_width=True,
+            )
 
-# 件数制限
-filtered_terms = filtered_terms[:max_items]
+
+@st.fragment
+def render_global_note():
+    """学習ノート（入力してもノート欄だけが再実行される）。"""
+    st.text_area(
+        "自由メモ",
+        value=memo_store.get(st.session_state.user_id, GLOBAL_NOTE_KEY),
+        height=200,
+        key="global_note",
+        on_change=save_memo,
+        args=(GLOBAL_NOTE_KEY, "global_note"),
+    )
+    global_note = memo_store.get(st.session_state.user_id, GLOBAL_NOTE_KEY)
+
+    if global_note.strip():
+        st.success("✅ メモが保存されました（保存用のキーがあれば次回も表示されます）。")
+    else:
+        st.warning("まだメモがありません。学んだことを1行だけでも残しておくと、復習しやすくなります。")
+
+
+def render_memo_search():
+    """メモ・学習ノートの検索。
+
+    結果の用語を選ぶと辞書ビュー（別のフラグメント）も変わるので、
+    フラグメントにはせず全体の再実行で描く。
+    """
+    st.markdown("#### 🔎 メモを検索")
+    memo_query = st.text_input(
+        "用語メモ・学習ノートを検索",
+        key="memo_query",
+        placeholder="例: rebase / コンフリクト",
+    )
+    if not memo_query.strip():
+        return
+
+    # メモのインデックスは編集のたびに差分で更新済みなので、ここでは引くだけ
+    hits = memo_store.search(st.session_state.user_id, memo_query)
+    if not hits:
+        st.caption("一致するメモはありません。")
+        return
+
+    st.caption(f"{len(hits)} 件（用語を押すと辞書ビューに表示されます）")
+    for hit in hits:
+        snippet = markdown_snippet(hit.text, hit.span)
+        if hit.key == GLOBAL_NOTE_KEY:
+            st.markdown(f"📝 学習ノート：{snippet}")
+            continue
+        term = store.get(hit.key)
+        if term is None:
+            st.markdown(f"🗑 {escape_markdown(hit.key)}（辞書にない用語）：{snippet}")
+            continue
+        st.button(
+            f"{term.name}：{snippet}",
+            key=f"memo_hit_{hit.key}",
+            on_click=select_term,
+            args=(hit.key,),
+        )
 
 
 # ==============================
@@ -412,9 +811,17 @@ filtered_terms = filtered_terms[:max_items]
 # ==============================
 tab_dict, tab_table, tab_memo = st.tabs(["📋 辞書ビュー", "📊 一覧表", "📝 ノート"])
 
+filter_key = (
+    store.version,
+    category_filter,
+    include_advanced,
+    search_query,
+    max_items,
+)
+
 # ---------- タブ1：辞書ビュー ----------
 with tab_dict:
-    col_left, col_mid, col_right = st.columns([1.4, 1.2, 2])
+    col_left, col_main = st.columns([1.4, 3.2])
 
     # 左カラム：Gitとは
     with col_left:
@@ -459,24 +866,8 @@ Gitは、ソースコードのバージョン管理システムです。
 
         st.markdown("---")
         st.markdown("#### 🔄 基本的なワークフロー")
-        steps = [
-            "ファイルを編集",
-            "変更をステージング（git add）",
-            "コミット（git commit）",
-            "リモートにプッシュ（git push）",
-        ]
-        for i, step in enumerate(steps, 1):
-            st.markdown(
-                f"""
-<div class="workflow-step">
-  <div class="step-number">{i}</div>
-  <div style="font-size: 0.875rem; color: #374151; padding-top: 0.125rem;">
-    {step}
-  </div>
-</div>
-""",
-                unsafe_allow_html=True,
-            )
+        for i, step in enumerate(WORKFLOW_STEPS, 1):
+            st.markdown(workflow_step_html(i, step), unsafe_allow_html=True)
 
         st.markdown("---")
         st.markdown(
@@ -492,135 +883,18 @@ Gitは、ソースコードのバージョン管理システムです。
             unsafe_allow_html=True,
         )
 
-# 中央カラム：用語一覧
-with col_mid:
-    st.subheader("📋 用語一覧")
-    st.caption(f"{len(filtered_terms)} 件ヒット")
-
-    # ★ ラジオは「表示順の切り替え」にだけ使う（機能カウント用にもなる）
-    list_mode = st.radio(
-        "表示順",
-        options=["カテゴリ別", "名前順"],
-        horizontal=True,
-        key="list_mode",
-    )
-
-    if list_mode == "名前順":
-        # 名前順に並べてボタンで選択
-        terms_for_view = sorted(filtered_terms, key=lambda t: t["name"])
-        for term in terms_for_view:
-            if st.button(
-                f"{term['name']}：{term['short_description']}",
-                key=f"term_{term['id']}",
-                use_container_width=True,
-            ):
-                st.session_state.selected_term_id = term["id"]
-
-    else:
-        # カテゴリ別に表示して、各用語はボタンで選択
-        for category in CATEGORIES:
-            cat_terms = [t for t in filtered_terms if t["category"] == category]
-            if not cat_terms:
-                continue
-
-            st.markdown(
-                f"<div class='category-header'>{category}</div>",
-                unsafe_allow_html=True,
-            )
-
-            for term in cat_terms:
-                if st.button(
-                    f"{term['name']}：{term['short_description']}",
-                    key=f"term_{term['id']}",
-                    use_container_width=True,
-                ):
-                    st.session_state.selected_term_id = term["id"]
-
-                    break
-
-    # 右カラム：用語詳細
-    with col_right:
-        selected_term = next(
-            (t for t in TERMS if t["id"] == st.session_state.selected_term_id),
-            TERMS[0],
-        )
-
-        st.subheader("📖 用語詳細")
-
-        st.markdown(
-            f"<span class='tag'>📌 {selected_term['category']}</span>",
-            unsafe_allow_html=True,
-        )
-        st.markdown(f"### {selected_term['name']}")
-        st.markdown(
-            f"**一言説明：** {selected_term['short_description']}",
-        )
-
-        st.markdown("---")
-        st.markdown("#### 詳細説明")
-        st.markdown(
-            f"""
-<div style="background-color: #f9fafb; padding: 1rem; border-radius: 0.5rem;">
-  <p style="color: #374151; line-height: 1.75; margin: 0;">
-    {selected_term['full_description']}
-  </p>
-</div>
-""",
-            unsafe_allow_html=True,
-        )
+timer.lap("intro")
 
-        if selected_term.get("examples"):
-            st.markdown("#### 💻 使用例")
-            for example in selected_term["examples"]:
-                st.code(example, language="bash")
-
-        if selected_term.get("related_terms"):
-            st.markdown("#### 🔗 関連用語")
-            related_terms = [
-                t
-                for t in TERMS
-                if t["id"] in selected_term.get("related_terms", [])
-            ]
-            for rt in related_terms:
-                if st.button(
-                    f"{rt['name']}：{rt['short_description']}",
-                    key=f"related_{rt['id']}",
-                ):
-                    st.session_state.selected_term_id = rt["id"]
+with col_main:
+    render_dictionary(filter_result, filter_key[1:])
 
-        st.markdown("---")
-        st.info(
-            "💬 サイドバーの「この用語の社内での使い方・注意点」にメモを残しておくと、"
-            "自分用のGitリファレンスとして育てることができます。"
-        )
+timer.lap("dictionary")
 
 # ---------- タブ2：一覧表 & ダウンロード ----------
 with tab_table:
-    st.subheader("📊 用語一覧（表形式）")
-
-    table_data = [
-        {
-            "ID": t["id"],
-            "用語": t["name"],
-            "カテゴリ": t["category"],
-            "一言説明": t["short_description"],
-        }
-        for t in filtered_terms
-    ]
-    df = pd.DataFrame(table_data)
-
-    st.dataframe(df, use_container_width=True)
+    render_table(filter_key, filter_result.positions)
 
-    csv = df.to_csv(index=False).encode("utf-8-sig")
-
-    st.download_button(
-        label="📥 この一覧をCSVでダウンロード",
-        data=csv,
-        file_name="git_terms.csv",
-        mime="text/csv",
-    )
-
-    st.caption("※ 絞り込み条件・検索結果に応じた内容がダウンロードされます。")
+timer.lap("table")
 
 # ---------- タブ3：全体ノート ----------
 with tab_memo:
@@ -629,23 +903,49 @@ with tab_memo:
     st.markdown(
         """
 Gitやこの辞典を使って気づいたこと・疑問点・社内での運用ルール案などを、
-自由にメモしておくスペースです。（ローカルセッションのみ）
+自由にメモしておくスペースです。（サイドバーで発行した保存用のキーごとに保存されます）
 """
     )
 
-    if "global_note" not in st.session_state:
-        st.session_state.global_note = ""
+    render_global_note()
 
-    global_note = st.text_area(
-        "自由メモ",
-        value=st.session_state.global_note,
-        height=200,
-    )
-    st.session_state.global_note = global_note
+    render_memo_search()
 
-    if global_note.strip():
-        st.success("✅ メモが保存されました（ブラウザを閉じるまでは保持されます）。")
-    else:
-        st.warning("まだメモがありません。学んだことを1行だけでも残しておくと、復習しやすくなります。")
+timer.lap("note")
 
 
+# ==============================
+# デバッグパネル（計測が有効なときだけ）
+# ==============================
+if timer.enabled:
+    total_ms = timer.finish()
+    with st.sidebar:
+        with st.expander("🛠 再実行の計測", expanded=False):
+            st.caption(f"今回の再実行：{total_ms:.1f} ms")
+            st.dataframe(
+                [
+                    {
+                        "区間": name,
+                        "回数": stats["count"],
+                        "p50 (ms)": round(stats["p50"], 2),
+                        "p90 (ms)": round(stats["p90"], 2),
+                        "p99 (ms)": round(stats["p99"], 2),
+                    }
+                    for name, stats in get_profiler().summary().items()
+                ],
+                use_container_width=True,
+                hide_index=True,
+            )
+            st.caption(
+                f"コーパス {locale} v{corpus.version}（{store.version}）"
+                f" / 読み込み済みの言語：{', '.join(corpus_registry.loaded())}"
+            )
+            last_error = corpus_registry.manager(locale).last_error
+            if last_error:
+                st.warning(f"用語集の取り込みエラー：{last_error}")
+            st.caption("絞り込みキャッシュ")
+            st.json(corpus.filter_cache.stats())
+            st.caption("用語詳細キャッシュ")
+            st.json(corpus.detail_cache.stats())
+            st.caption("クイズ問題キャッシュ")
+            st.json(corpus.question_bank.stats())
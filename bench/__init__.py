@@ -0,0 +1 @@
+"""ベンチマーク・負荷試験用のツール（アプリ本体からは使わない）。"""
@@ -0,0 +1,332 @@
+"""同時セッションの負荷試験。
+
+アプリを localhost で起動し、ブラウザと同じ WebSocket プロトコル
+（/_stcore/stream で BackMsg / ForwardMsg の protobuf をやり取りする）で
+N 個のセッションを同時に開く。各セッションは検索語の入力・カテゴリの
+切り替え・用語のクリック・メモの編集を繰り返し、同時接続数ごとに
+スループット・再実行レイテンシ（p50 / p99）・サーバーの RSS を表示する。
+フラグメントの中のウィジェットを操作したときは、ブラウザと同じく
+そのフラグメントだけを再実行させる。
+
+使い方（リポジトリのルートで）:
+
+    python -m bench.load_test --concurrency 1,5,10,25 --iterations 3
+    python -m bench.load_test --corpus-size 10000 --output load_results.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from collections import defaultdict
+from pathlib import Path
+
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from tornado.websocket import websocket_connect
+
+from bench.synthetic import write_corpus
+from gitdict.perf import percentile
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+APP_PATH = REPO_ROOT / "app.py"
+
+SEARCH_WORDS = ["コミット", "ブランチ", "merge", "リモート"]
+RERUN_TIMEOUT = 120
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def server_rss_kib(pid):
+    """プロセスの RSS（KiB）。/proc が読めない環境では None。"""
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+class AppServer:
+    """streamlit run でアプリをサブプロセスとして起動する。"""
+
+    def __init__(self, port, env):
+        self.port = port
+        self.env = env
+        self.process = None
+
+    def __enter__(self):
+        self.process = subprocess.Popen(
+            [
+                sys.executable,
+                "-m",
+                "streamlit",
+                "run",
+                str(APP_PATH),
+                "--server.headless=true",
+                f"--server.port={self.port}",
+                "--server.address=127.0.0.1",
+                "--browser.gatherUsageStats=false",
+            ],
+            cwd=REPO_ROOT,
+            env=self.env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            try:
+                with urllib.request.urlopen(
+                    f"http://127.0.0.1:{self.port}/_stcore/health", timeout=1
+                ) as res:
+                    if res.status == 200:
+                        return self
+            except OSError:
+                time.sleep(0.2)
+        self.__exit__(None, None, None)
+        raise RuntimeError("アプリのサーバーが起動しませんでした")
+
+    def __exit__(self, *exc):
+        if self.process is not None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+class SimulatedSession:
+    """WebSocket で接続した1つのブラウザセッション。"""
+
+    def __init__(self, url, rng):
+        self.url = url
+        self.rng = rng
+        self.conn = None
+        self.query_string = ""
+        self.widgets = {}  # 直近の実行で描画されたウィジェット id -> (種類, ラベル, proto)
+        self.fragments = {}  # ウィジェット id -> 描画したフラグメントの id（外なら ""）
+        self.values = {}  # 送信するウィジェット id -> WidgetState を設定する関数
+        self.latencies = defaultdict(list)  # 操作名 -> [ミリ秒]
+
+    async def connect(self):
+        self.conn = await websocket_connect(self.url)
+        await self.rerun("initial")
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+
+    def find_widget(self, suffix=None, label=None):
+        for widget_id, (kind, widget_label, proto) in self.widgets.items():
+            if suffix is not None and widget_id.endswith(f"-{suffix}"):
+                return widget_id, proto
+            if label is not None and widget_label == label:
+                return widget_id, proto
+        return None, None
+
+    async def rerun(self, action, trigger_id=None, fragment_id=""):
+        msg = BackMsg()
+        client_state = msg.rerun_script
+        client_state.query_string = self.query_string
+        client_state.fragment_id = fragment_id
+        for widget_id, apply in self.values.items():
+            state = client_state.widget_states.widgets.add()
+            state.id = widget_id
+            apply(state)
+        if trigger_id is not None:
+            state = client_state.widget_states.widgets.add()
+            state.id = trigger_id
+            state.trigger_value = True
+
+        started = time.perf_counter()
+        await self.conn.write_message(msg.SerializeToString(), binary=True)
+        widgets = {}
+        fragments = {}
+        while True:
+            payload = await asyncio.wait_for(self.conn.read_message(), RERUN_TIMEOUT)
+            if payload is None:
+                raise ConnectionError("サーバーとの接続が切れました")
+            fmsg = ForwardMsg()
+            fmsg.ParseFromString(payload)
+            kind = fmsg.WhichOneof("type")
+            if kind == "delta" and fmsg.delta.WhichOneof("type") == "new_element":
+                element = fmsg.delta.new_element
+                element_kind = element.WhichOneof("type")
+                proto = getattr(element, element_kind)
+                widget_id = getattr(proto, "id", "")
+                if widget_id:
+                    widgets[widget_id] = (element_kind, getattr(proto, "label", ""), proto)
+                    fragments[widget_id] = fmsg.delta.fragment_id
+            elif kind == "page_info_changed":
+                self.query_string = fmsg.page_info_changed.query_string
+            elif kind == "script_finished":
+                break
+        self.latencies[action].append((time.perf_counter() - started) * 1000)
+        if fragment_id:
+            # フラグメントだけの再実行では、ほかのウィジェットは描画し直されない
+            rerun = {fragment_id} | set(fragments.values())
+            for widget_id in [w for w, f in self.fragments.items() if f in rerun]:
+                del self.widgets[widget_id], self.fragments[widget_id]
+            self.widgets.update(widgets)
+            self.fragments.update(fragments)
+        else:
+            self.widgets = widgets
+            self.fragments = fragments
+
+    async def set_text(self, action, widget_id, text):
+        self.values[widget_id] = lambda state: setattr(state, "string_value", text)
+        await self.rerun(action, fragment_id=self.fragments.get(widget_id, ""))
+
+    async def run_scenario(self):
+        # 1. 検索語を1文字ずつ入力してから消す
+        search_id, _ = self.find_widget(suffix="search_query")
+        word = self.rng.choice(SEARCH_WORDS)
+        for i in range(1, len(word) + 1):
+            await self.set_text("search_typing", search_id, word[:i])
+        await self.set_text("search_typing", search_id, "")
+
+        # 2. カテゴリを切り替えて戻す
+        category_id, proto = self.find_widget(label="カテゴリフィルタ")
+        index = self.rng.randrange(1, len(proto.options))
+        self.values[category_id] = lambda state: setattr(state, "int_value", index)
+        await self.rerun("category_switch")
+        self.values[category_id] = lambda state: setattr(state, "int_value", 0)
+        await self.rerun("category_switch")
+
+        # 3. 表示中の用語をクリックする
+        term_buttons = [
+            widget_id
+            for widget_id, (kind, _, _) in self.widgets.items()
+            if kind == "button" and "-term_" in widget_id
+        ]
+        if term_buttons:
+            button_id = self.rng.choice(term_buttons)
+            await self.rerun(
+                "term_click", trigger_id=button_id, fragment_id=self.fragments[button_id]
+            )
+
+        # 4. 選択中の用語のメモを編集する
+        memo_id = next(
+            (w for w, (kind, _, _) in self.widgets.items() if kind == "text_area" and "-memo_" in w),
+            None,
+        )
+        if memo_id is not None:
+            await self.set_text("memo_edit", memo_id, f"負荷試験メモ {self.rng.random():.6f}")
+
+
+async def run_level(url, concurrency, iterations, server_pid, seed):
+    """concurrency 個のセッションを同時に動かして結果を集計する。"""
+    sessions = [SimulatedSession(url, random.Random(seed + i)) for i in range(concurrency)]
+    rss_samples = []
+
+    async def sample_rss():
+        while True:
+            rss = server_rss_kib(server_pid)
+            if rss is not None:
+                rss_samples.append(rss)
+            await asyncio.sleep(0.2)
+
+    async def drive(session):
+        await session.connect()
+        for _ in range(iterations):
+            await session.run_scenario()
+
+    sampler = asyncio.ensure_future(sample_rss())
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(drive(s) for s in sessions))
+    finally:
+        elapsed = time.perf_counter() - started
+        sampler.cancel()
+        for s in sessions:
+            s.close()
+
+    by_action = defaultdict(list)
+    for s in sessions:
+        for action, values in s.latencies.items():
+            by_action[action].extend(values)
+    everything = sorted(v for values in by_action.values() for v in values)
+
+    def describe(values):
+        values = sorted(values)
+        return {
+            "count": len(values),
+            "p50_ms": percentile(values, 50),
+            "p99_ms": percentile(values, 99),
+            "mean_ms": statistics.fmean(values) if values else None,
+        }
+
+    return {
+        "concurrency": concurrency,
+        "reruns": len(everything),
+        "elapsed_s": elapsed,
+        "throughput_rps": len(everything) / elapsed if elapsed else None,
+        **describe(everything),
+        "rss_peak_kib": max(rss_samples) if rss_samples else None,
+        "rss_end_kib": server_rss_kib(server_pid),
+        "by_action": {action: describe(values) for action, values in sorted(by_action.items())},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", default="1,5,10", help="カンマ区切りの同時セッション数")
+    parser.add_argument("--iterations", type=int, default=3, help="セッションごとのシナリオ実行回数")
+    parser.add_argument("--corpus-size", type=int, help="合成コーパスの件数（省略時は data/ja/terms.json）")
+    parser.add_argument("--port", type=int, help="サーバーのポート（省略時は空きポート）")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="結果を書き出す JSON ファイル")
+    args = parser.parse_args(argv)
+
+    levels = [int(c) for c in args.concurrency.split(",") if c]
+    port = args.port or _free_port()
+
+    with tempfile.TemporaryDirectory(prefix="gitdict-load-") as tmp:
+        env = dict(os.environ)
+        env["GITDICT_STATE_DIR"] = str(Path(tmp) / "state")
+        # 大きな ForwardMsg を参照（ref_hash）で送られるとウィジェットの id が
+        # 読めなくなるので、メッセージキャッシュを事実上無効にしておく
+        env["STREAMLIT_GLOBAL_MIN_CACHED_MESSAGE_SIZE"] = str(10**12)
+        if args.corpus_size:
+            env["GITDICT_TERMS_PATH"] = str(
+                write_corpus(Path(tmp) / "terms.json", args.corpus_size)
+            )
+
+        with AppServer(port, env) as server:
+            url = f"ws://127.0.0.1:{port}/_stcore/stream"
+            results = []
+            for level in levels:
+                result = asyncio.run(
+                    run_level(url, level, args.iterations, server.process.pid, args.seed)
+                )
+                results.append(result)
+                rss = result["rss_peak_kib"]
+                print(
+                    f"同時 {level:>4} セッション: {result['reruns']:>5} 回 "
+                    f"{result['throughput_rps']:8.1f} rerun/s  "
+                    f"p50 {result['p50_ms']:8.1f} ms  p99 {result['p99_ms']:8.1f} ms  "
+                    f"RSS {'-' if rss is None else f'{rss / 1024:.0f} MiB'}"
+                )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"results": results}, f, ensure_ascii=False, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,380 @@
+"""辞典のデータ処理まわりのマイクロベンチマーク。
+
+合成コーパス（bench.synthetic）を件数ごとに作り、用語ストアの読み込み・
+インデックス構築・絞り込み・検索・並べ替え・関連用語・エクスポートを
+純粋関数として計測する。計測の前に、空のフィールドがあっても検索できること、
+コーパスから一時的に消えた用語の復習予定が残ること、
+類似度の差分更新が全体の作り直しと同じ近傍になることを確かめる。あわせて streamlit.testing の AppTest で
+アプリ全体の再実行時間も測る。結果は JSON に書き出し、--compare で
+以前の結果と比べられる。
+
+使い方（リポジトリのルートで）:
+
+    python -m bench.run_bench --sizes 100,1000,10000 --output bench_results.json
+    python -m bench.run_bench --compare bench_results_old.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# アプリのメモ・計測ファイルがリポジトリに書かれないように一時ディレクトリへ逃がす
+os.environ.setdefault("GITDICT_STATE_DIR", tempfile.mkdtemp(prefix="gitdict-bench-"))
+
+from bench.synthetic import write_corpus  # noqa: E402
+from gitdict.collation import Collation  # noqa: E402
+from gitdict.export import build_table, export_bytes  # noqa: E402
+from gitdict.facets import FacetIndex  # noqa: E402
+from gitdict.filtering import filter_terms  # noqa: E402
+from gitdict.highlight import list_label  # noqa: E402
+from gitdict.memo_search import MemoIndex  # noqa: E402
+from gitdict.quiz_store import ReviewQueue  # noqa: E402
+from gitdict.related_graph import RelatedGraph  # noqa: E402
+from gitdict.search_index import SearchIndex  # noqa: E402
+from gitdict.similarity import REBUILD_RATIO, SimilarityIndex  # noqa: E402
+from gitdict.term_store import TermStore, load_term_store  # noqa: E402
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+APP_PATH = REPO_ROOT / "app.py"
+
+DEFAULT_SIZES = (100, 1000, 10000, 100000)
+
+# 1操作あたりの計測に使う時間の目安（秒）と最大反復回数
+TIME_BUDGET = 0.5
+MAX_REPEAT = 200
+
+
+def measure(fn, min_repeat=3):
+    """fn を繰り返し実行して所要時間（ミリ秒）とメモリのピーク（KiB）を返す。"""
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < MAX_REPEAT and (
+        len(timings) < min_repeat or time.perf_counter() - started < TIME_BUDGET
+    ):
+        t0 = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - t0) * 1000)
+
+    # メモリの計測は tracemalloc のオーバーヘッドが乗るので時間計測とは分ける
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "repeat": len(timings),
+        "median_ms": statistics.median(timings),
+        "min_ms": min(timings),
+        "peak_kib": peak / 1024,
+    }
+
+
+def data_path_operations(corpus_path):
+    """(操作名, 関数) の列を返す。インデックス類は事前に1回だけ作っておく。"""
+    store = load_term_store(corpus_path)
+    index = SearchIndex(store)
+    facets = FacetIndex(store)
+    graph = RelatedGraph(store)
+    collation = Collation(store)
+    similarity = SimilarityIndex(store)
+    rng = random.Random(0)
+    sample_ids = rng.sample(store.ids(), k=min(100, len(store)))
+    all_positions = filter_terms(store, index, facets, None, True, "", None).positions
+    table = build_table(store.terms)
+    search_result = filter_terms(store, index, facets, None, True, "リポジトリ", 20)
+    # 長いメモを数百件書いたユーザー（各用語の説明文をつなげてメモにする）
+    memos = {
+        term.id: term.full_description * 10 for term in store.terms[: min(500, len(store))]
+    }
+    memo_index = MemoIndex(memos)
+    memo_key = next(iter(memos))
+
+    def related_lookup():
+        for term_id in sample_ids:
+            graph.neighbors(term_id)
+            graph.referenced_by(term_id)
+            graph._bfs(term_id, 2)
+
+    def label_page():
+        for pos in search_result.positions:
+            list_label(store.terms[pos], search_result.matches.get(pos))
+
+    def similar_lookup():
+        for term_id in sample_ids:
+            similarity.neighbors(term_id)
+
+    # 1件だけ説明文を変えたコーパス（類似度の差分更新の計測用）
+    edited = [t.to_dict() for t in store]
+    edited[0]["full_description"] += "（更新）"
+    edited_store = TermStore(
+        edited,
+        [{"name": c, "advanced": c in store.advanced_categories} for c in store.categories],
+    )
+
+    return [
+        ("load_store", lambda: load_term_store(corpus_path)),
+        ("build_search_index", lambda: SearchIndex(store)),
+        ("build_facets", lambda: FacetIndex(store)),
+        ("build_related_graph", lambda: RelatedGraph(store)),
+        ("build_collation", lambda: Collation(store)),
+        ("filter_all", lambda: filter_terms(store, index, facets, None, True, "", None)),
+        (
+            "filter_category",
+            lambda: filter_terms(store, index, facets, "基本操作", False, "", 20),
+        ),
+        ("search_ja", lambda: filter_terms(store, index, facets, None, True, "リポジトリ", 20)),
+        ("search_en", lambda: filter_terms(store, index, facets, None, True, "rebase", 20)),
+        ("search_1char", lambda: filter_terms(store, index, facets, None, True, "ア", 20)),
+        ("highlight_labels_20", label_page),
+        ("build_memo_index_500", lambda: MemoIndex(memos)),
+        ("memo_update_1", lambda: memo_index.update(memo_key, memos[memo_key] + "（追記）")),
+        ("memo_search", lambda: memo_index.search("リポジトリ")),
+        ("sort_reading_all", lambda: collation.ordered(all_positions, "reading")),
+        ("sort_reading_20", lambda: collation.ordered(all_positions[:20], "reading")),
+        ("related_lookup_x100", related_lookup),
+        ("build_similarity", lambda: SimilarityIndex(store)),
+        ("update_similarity_1", lambda: similarity.updated(edited_store)),
+        ("similar_lookup_x100", similar_lookup),
+        ("export_csv", lambda: export_bytes(table, "CSV")),
+        ("export_jsonl", lambda: export_bytes(table, "JSONL")),
+        ("export_parquet", lambda: export_bytes(table, "Parquet")),
+    ]
+
+
+# 類似度の差分更新を全体の作り直しと比べるときに使う用語数（打ち切りなしの
+# 厳密な近傍は用語数の2乗で重くなるので先頭だけを使う）
+SIMILARITY_CHECK_SIZE = 300
+
+
+def _same_neighbors(expected, actual, ids, tol=1e-5):
+    """近傍の類似度が tol 以内で一致し、k 番目と同点の用語を除いて同じ用語か。"""
+    for term_id in ids:
+        a, b = expected.neighbors(term_id), actual.neighbors(term_id)
+        if len(a) != len(b) or any(abs(x[1] - y[1]) > tol for x, y in zip(a, b)):
+            return False
+        kth = a[-1][1] if a else 0.0
+        if {i for i, s in a if s > kth + tol} != {i for i, s in b if s > kth + tol}:
+            return False
+    return True
+
+
+def check_similarity_update(store, size=SIMILARITY_CHECK_SIZE):
+    """SimilarityIndex.updated() の結果が全体の作り直しと一致するかを確かめる。
+
+    IDF は作り直すまで据え置くので、n-gram ごとの出現する用語数が変わらない更新
+    （用語の説明文の一部を繰り返す）を、候補を打ち切らない設定で比べる。
+    """
+    terms = [t.to_dict() for t in store.terms[:size]]
+    categories = [
+        {"name": c, "advanced": c in store.advanced_categories} for c in store.categories
+    ]
+    # 一部の用語の使用例に、その用語の一言説明を繰り返し足す（n-gram の出現数だけが変わる）
+    edited = [dict(t) for t in terms]
+    for t in edited[:: max(1, int(1 / REBUILD_RATIO))]:
+        t["examples"] = t["examples"] + [t["short_description"]] * 3
+    before, after = TermStore(terms, categories), TermStore(edited, categories)
+
+    exact = {"candidate_postings": None, "rerank_candidates": None}
+    updated = SimilarityIndex(before, **exact).updated(after)
+    rebuilt = SimilarityIndex(after, **exact)
+    if not _same_neighbors(rebuilt, updated, after.ids()):
+        raise RuntimeError("類似度の差分更新の結果が全体の作り直しと一致しません")
+
+
+def check_empty_field_search():
+    """どの用語でも空のフィールド（使用例なし）があっても検索できるかを確かめる。"""
+    terms = [
+        {
+            "id": f"term{i}",
+            "name": f"用語{i}",
+            "category": "基本操作",
+            "short_description": "変更を記録する",
+            "full_description": "",
+            "examples": [],
+            "related_terms": [],
+        }
+        for i in range(3)
+    ]
+    index = SearchIndex(TermStore(terms, [{"name": "基本操作", "advanced": False}]))
+    if [hit.position for hit in index.search("用語1")] != [1] or index.search("git"):
+        raise RuntimeError("空のフィールドがあるコーパスの検索結果が正しくありません")
+
+
+def check_quiz_missing_term():
+    """コーパスから一時的に消えた用語の復習予定が、戻ったときに残っているかを確かめる。"""
+    categories = [{"name": "基本操作", "advanced": False}]
+
+    def store(ids):
+        return TermStore(
+            [
+                {
+                    "id": term_id,
+                    "name": term_id,
+                    "category": "基本操作",
+                    "short_description": "",
+                    "full_description": "",
+                    "examples": [],
+                    "related_terms": [],
+                }
+                for term_id in ids
+            ],
+            categories,
+        )
+
+    full = store(["repository", "commit"])
+    queue = ReviewQueue()
+    queue.record("repository", False, now=0)
+    due = queue.states["repository"].due
+    if queue.next_card(store(["commit"]), now=due) != "commit":
+        raise RuntimeError("消えた用語がクイズに出題されました")
+    if queue.next_card(full, now=due) != "repository" or queue.next_due(full) != due:
+        raise RuntimeError("コーパスに戻った用語の復習予定が失われました")
+
+
+def apptest_operations(corpus_path, reruns=5):
+    """AppTest でアプリ全体を実行したときの再実行時間とメモリを測る。"""
+    import streamlit as st
+    from streamlit.testing.v1 import AppTest
+
+    os.environ["GITDICT_TERMS_PATH"] = str(corpus_path)
+    st.cache_resource.clear()
+    st.cache_data.clear()
+
+    results = {}
+    at = AppTest.from_file(str(APP_PATH), default_timeout=600)
+
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    at.run()
+    cold_ms = (time.perf_counter() - t0) * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if at.exception:
+        raise RuntimeError(f"アプリの実行に失敗しました: {at.exception}")
+    results["app_cold_run"] = {"repeat": 1, "median_ms": cold_ms, "min_ms": cold_ms, "peak_kib": peak / 1024}
+
+    def timed(action):
+        timings = []
+        for _ in range(reruns):
+            t0 = time.perf_counter()
+            action()
+            timings.append((time.perf_counter() - t0) * 1000)
+        return {
+            "repeat": reruns,
+            "median_ms": statistics.median(timings),
+            "min_ms": min(timings),
+            "peak_kib": None,
+        }
+
+    results["app_rerun"] = timed(at.run)
+    queries = iter(["リ", "リポ", "リポジ", "rebase", "コミット"] * reruns)
+    results["app_search_rerun"] = timed(
+        lambda: at.text_input(key="search_query").input(next(queries)).run()
+    )
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(sizes, with_apptest=True):
+    check_empty_field_search()
+    check_quiz_missing_term()
+    results = []
+    with tempfile.TemporaryDirectory(prefix="gitdict-corpus-") as tmp:
+        for size in sizes:
+            corpus_path = write_corpus(Path(tmp) / f"terms_{size}.json", size)
+            print(f"--- {size} 件", file=sys.stderr)
+            check_similarity_update(load_term_store(corpus_path))
+            measured = {name: measure(fn) for name, fn in data_path_operations(corpus_path)}
+            if with_apptest:
+                measured.update(apptest_operations(corpus_path))
+            for name, stats in measured.items():
+                print(f"{name:24s} {stats['median_ms']:10.3f} ms", file=sys.stderr)
+                results.append({"size": size, "operation": name, **stats})
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+
+
+def compare(old, new, threshold):
+    """中央値が threshold 倍を超えて遅くなった操作を表示し、その件数を返す。"""
+    old_index = {(r["size"], r["operation"]): r for r in old["results"]}
+    regressions = 0
+    for r in new["results"]:
+        before = old_index.get((r["size"], r["operation"]))
+        if before is None or not before["median_ms"]:
+            continue
+        ratio = r["median_ms"] / before["median_ms"]
+        mark = ""
+        if ratio > threshold:
+            mark = "  <-- 遅くなりました"
+            regressions += 1
+        print(
+            f"{r['size']:>7} {r['operation']:24s} "
+            f"{before['median_ms']:10.3f} -> {r['median_ms']:10.3f} ms (x{ratio:.2f}){mark}"
+        )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--sizes",
+        default=",".join(map(str, DEFAULT_SIZES)),
+        help="カンマ区切りのコーパス件数（既定: %(default)s）",
+    )
+    parser.add_argument("--output", default="bench_results.json", help="結果の JSON ファイル")
+    parser.add_argument("--no-apptest", action="store_true", help="AppTest による計測を省く")
+    parser.add_argument("--compare", help="比較する以前の結果 JSON")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.2,
+        help="--compare で遅くなったとみなす倍率（既定: %(default)s）",
+    )
+    args = parser.parse_args(argv)
+
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+    report = run(sizes, with_apptest=not args.no_apptest)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"結果を {args.output} に書き出しました", file=sys.stderr)
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            old = json.load(f)
+        if compare(old, report, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""ベンチマーク用の合成コーパス。
+
+data/ja/terms.json と同じ形（categories + terms）で、日本語と英語が混ざった
+用語を任意の件数だけ作る。乱数のシードを固定しているので、同じ件数なら
+毎回同じ内容になる。
+"""
+
+import json
+import random
+
+CATEGORIES = [
+    {"name": "基本概念", "advanced": False},
+    {"name": "基本操作", "advanced": False},
+    {"name": "応用操作", "advanced": True},
+    {"name": "トラブルシューティング", "advanced": True},
+]
+
+_KATAKANA = "アイウエオカキクケコサシスセソタチツテトナニヌネノハヒフヘホマミムメモヤユヨラリルレロワン"
+_SUFFIXES = ["ー", "ッ", "ャ", "ュ", "ョ", ""]
+_EN_SYLLABLES = ["com", "mit", "re", "base", "stash", "fe", "tch", "mer", "ge", "tag", "lo", "g", "bran", "ch"]
+_PHRASES = [
+    "リポジトリの状態を記録します。",
+    "変更履歴を保存し、いつでも過去の状態に戻せます。",
+    "チーム開発では作業開始前に最新状態を取得します。",
+    "コンフリクトが発生した場合は手動で解決する必要があります。",
+    "ブランチを切り替えてから作業を始めます。",
+    "The command updates the working tree and the index.",
+    "Use this option carefully on shared branches.",
+    "ステージングエリアに追加した変更だけがコミットされます。",
+]
+
+
+def _katakana_word(rng):
+    return "".join(
+        rng.choice(_KATAKANA) + rng.choice(_SUFFIXES) for _ in range(rng.randint(2, 5))
+    )
+
+
+def _english_word(rng):
+    return "".join(rng.choice(_EN_SYLLABLES) for _ in range(rng.randint(2, 3)))
+
+
+def make_corpus(size, seed=0, dangling_ratio=0.1):
+    """size 件の用語を持つコーパス（terms.json と同じ dict）を返す。"""
+    rng = random.Random(seed)
+    ids = [f"term{i:06d}" for i in range(size)]
+    terms = []
+    for term_id in ids:
+        english = _english_word(rng)
+        katakana = _katakana_word(rng)
+        related = rng.sample(ids, k=min(3, size))
+        if rng.random() < dangling_ratio:
+            related.append(f"missing-{rng.randint(0, size)}")
+        terms.append(
+            {
+                "id": term_id,
+                "name": f"{katakana} ({english.capitalize()})",
+                "category": rng.choice(CATEGORIES)["name"],
+                "short_description": rng.choice(_PHRASES),
+                "full_description": "".join(rng.choice(_PHRASES) for _ in range(4)),
+                "examples": [
+                    f"git {english} --{_english_word(rng)} で{katakana}を実行"
+                    for _ in range(rng.randint(1, 3))
+                ],
+                "related_terms": related,
+            }
+        )
+    return {"categories": CATEGORIES, "terms": terms}
+
+
+def write_corpus(path, size, seed=0):
+    """合成コーパスを JSON ファイルに書き出す。"""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(make_corpus(size, seed), f, ensure_ascii=False)
+    return path
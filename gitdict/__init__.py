@@ -0,0 +1 @@
+"""Git用語ミニ辞典のデータ層（用語ストア・検索インデックスなど）。"""
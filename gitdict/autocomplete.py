@@ -0,0 +1,59 @@
+"""検索欄の入力補完。
+
+用語名・日本語名・英語名（「コミット (Commit)」の括弧内）・id を正規化した
+キーを辞書順に並べた配列を作り、前方一致の範囲を二分探索で求める。
+補完は範囲の先頭から重複を除いて k 件取るだけなので O(log n + k)。
+"""
+
+from bisect import bisect_left
+from collections import namedtuple
+
+from gitdict.term_store import split_name
+from gitdict.textfold import fold
+
+# key: 一致した正規化済みキー、position: TermStore の定義順インデックス
+Suggestion = namedtuple("Suggestion", ["key", "position"])
+
+
+def term_keys(term):
+    """補完に使う用語のキー（正規化前）を返す。"""
+    japanese, alias = split_name(term.name)
+    keys = [term.name, term.id, japanese]
+    if alias:
+        keys.append(alias)
+    return keys
+
+
+class Autocomplete:
+    """前方一致の補完候補を返す。"""
+
+    def __init__(self, store):
+        entries = sorted(
+            {
+                (fold(key), pos)
+                for pos, term in enumerate(store)
+                for key in term_keys(term)
+                if key.strip()
+            }
+        )
+        self._keys = [key for key, _ in entries]
+        self._positions = [pos for _, pos in entries]
+
+    def complete(self, prefix, k=5):
+        """prefix で始まるキーを持つ用語を最大 k 件返す（同じ用語は1回だけ）。"""
+        p = fold(prefix.strip())
+        if not p:
+            return []
+        seen = set()
+        suggestions = []
+        i = bisect_left(self._keys, p)
+        while i < len(self._keys) and len(suggestions) < k:
+            key = self._keys[i]
+            if not key.startswith(p):
+                break
+            pos = self._positions[i]
+            if pos not in seen:
+                seen.add(pos)
+                suggestions.append(Suggestion(key, pos))
+            i += 1
+        return suggestions
@@ -0,0 +1,100 @@
+"""用語の並び順（照合順序）。
+
+コーパス読み込み時に並べ替えのキーを1回だけ計算し、並び順ごとに
+「全用語を並べた位置の配列（順列）」と「各用語の順位」を持っておく。
+絞り込み結果を並べるときは順列をマスクで絞るか順位の整数を並べるだけで、
+文字列の比較による並べ替えは再実行のたびには行わない。
+
+並び順:
+- reading: 日本語名の五十音順（清音→濁音・半濁音、小書き文字は大書きと同順、
+  長音符は直前の母音として扱う）
+- english: 括弧内の英語名のアルファベット順
+- category: カテゴリの定義順 → 五十音順
+"""
+
+import unicodedata
+
+import numpy as np
+
+from gitdict.term_store import split_name
+from gitdict.textfold import fold
+
+COLLATIONS = ("reading", "english", "category")
+
+_SMALL_TO_LARGE = str.maketrans("ぁぃぅぇぉっゃゅょゎゕゖ", "あいうえおつやゆよわかけ")
+
+_VOWELS = {}
+for _vowel, _chars in (
+    ("あ", "あかさたなはまやらわ"),
+    ("い", "いきしちにひみり"),
+    ("う", "うくすつぬふむゆる"),
+    ("え", "えけせてねへめれ"),
+    ("お", "おこそとのほもよろを"),
+):
+    for _char in _chars:
+        _VOWELS[_char] = _vowel
+
+_COMBINING_MARKS = {"\u3099", "\u309a"}  # 濁点・半濁点（結合文字）
+
+
+def reading_key(text):
+    """五十音順に並べるためのキー（第1キー: 清音化した読み、第2キー: 元の読み）。"""
+    folded = fold(text)
+    primary = []
+    for char in unicodedata.normalize("NFD", folded):
+        if char in _COMBINING_MARKS:
+            continue
+        char = char.translate(_SMALL_TO_LARGE)
+        if char == "ー" and primary:
+            char = _VOWELS.get(primary[-1], char)
+        primary.append(char)
+    return ("".join(primary), folded)
+
+
+def _permutation(keys):
+    order = np.array(sorted(range(len(keys)), key=keys.__getitem__), dtype=np.intp)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    order.setflags(write=False)
+    rank.setflags(write=False)
+    return order, rank
+
+
+class Collation:
+    """並び順ごとの順列と順位。"""
+
+    def __init__(self, store):
+        self.size = len(store)
+        category_codes = {c: code for code, c in enumerate(store.categories)}
+        readings = []
+        english = []
+        by_category = []
+        for term in store:
+            japanese, alias = split_name(term.name)
+            reading = reading_key(japanese)
+            readings.append(reading)
+            english.append((fold(alias or term.id), reading))
+            by_category.append((category_codes[term.category], reading))
+
+        self._orders = {}
+        self._ranks = {}
+        for kind, keys in (
+            ("reading", readings),
+            ("english", english),
+            ("category", by_category),
+        ):
+            self._orders[kind], self._ranks[kind] = _permutation(keys)
+
+    def ordered(self, positions, kind):
+        """positions を kind の順に並べた配列を返す。
+
+        件数が多いときは全体の順列をマスクで絞り込み（O(n)）、少ないときは
+        事前計算した順位（整数）で並べる。どちらも文字列は比較しない。
+        """
+        positions = np.asarray(positions, dtype=np.intp)
+        if len(positions) * 16 >= self.size:
+            mask = np.zeros(self.size, dtype=bool)
+            mask[positions] = True
+            order = self._orders[kind]
+            return order[mask[order]]
+        return positions[np.argsort(self._ranks[kind][positions], kind="stable")]
@@ -0,0 +1,249 @@
+"""コーパスのスナップショットとホットリロード。
+
+Corpus は TermStore と、そこから作る検索インデックス・マスク・関連グラフ・
+各種キャッシュをひとまとめにした読み取り専用のスナップショット。派生物は
+最初に使われたときに作られ、スナップショットごとに持つので、コーパスが
+更新されれば新しい version の Corpus とともに作り直される。類似度の近傍だけは
+作り直しが重いので、前のスナップショットのものから差分で更新し、再実行の
+スレッドを待たせないようにバックグラウンドのスレッドで作る。
+
+CorpusManager は一定間隔でソースを確認し、変化があれば新しい Corpus を
+作ってから参照を差し替える。各セッションは再実行の最初に current() を
+1回だけ呼び、その再実行の間は同じスナップショットを使う。
+
+CorpusRegistry はロケール（言語）ごとの CorpusManager をまとめる。各ロケールの
+用語データ・検索インデックス・並び順は、そのロケールが初めて選ばれたときに
+読み込んで全セッションで共有し、しばらく選ばれなければ手放す。起動時に
+読むのは最初に選ばれたロケールだけなので、ロケールを増やしても起動時間と
+メモリは増えない。
+"""
+
+import threading
+import time
+from functools import cached_property
+
+from gitdict.autocomplete import Autocomplete
+from gitdict.collation import Collation
+from gitdict.detail_view import DetailCache
+from gitdict.export import ExportCache
+from gitdict.facets import FacetIndex
+from gitdict.filtering import FilterCache
+from gitdict.ingest import GlossaryIngestor, available_locales, default_source
+from gitdict.quiz import QuestionBank
+from gitdict.related_graph import RelatedGraph
+from gitdict.search_index import SearchIndex
+from gitdict.similarity import SimilarityIndex
+from gitdict.term_store import TermStore
+
+# この秒数のあいだどのセッションからも使われなかったロケールは手放す
+IDLE_TIMEOUT = 15 * 60
+
+
+class Corpus:
+    """ある時点のコーパスと、その派生データ。"""
+
+    def __init__(self, store, version, previous=None):
+        self.store = store
+        # 取り込みのたびに増える通し番号（store.version は内容のハッシュ）
+        self.version = version
+        # 差分更新の元にする1つ前の Corpus（similarity を作ったら手放す）
+        self._previous = previous
+        self._similarity = None
+        self._similarity_thread = None
+        self._similarity_lock = threading.Lock()
+
+    @cached_property
+    def search_index(self):
+        return SearchIndex(self.store)
+
+    @cached_property
+    def autocomplete(self):
+        return Autocomplete(self.store)
+
+    @cached_property
+    def collation(self):
+        return Collation(self.store)
+
+    @cached_property
+    def facets(self):
+        return FacetIndex(self.store)
+
+    @cached_property
+    def related_graph(self):
+        return RelatedGraph(self.store)
+
+    def start_similarity(self):
+        """similarity をバックグラウンドで作り始める（作り始めていれば何もしない）。"""
+        with self._similarity_lock:
+            if self._similarity_thread is None:
+                self._similarity_thread = threading.Thread(
+                    target=self._build_similarity,
+                    name=f"gitdict-similarity-{self.version}",
+                    daemon=True,
+                )
+                self._similarity_thread.start()
+
+    def _build_similarity(self):
+        previous, self._previous = self._previous, None
+        # 前の Corpus が作り始めていれば、作り終わるのを待って差分で更新する
+        base = None
+        if previous is not None and previous._similarity_thread is not None:
+            base = previous.similarity
+        self._similarity = (
+            base.updated(self.store) if base is not None else SimilarityIndex(self.store)
+        )
+
+    @property
+    def similarity(self):
+        """似ている用語の近傍（作り終わっていなければ作り終わるまで待つ）。"""
+        self.start_similarity()
+        self._similarity_thread.join()
+        return self._similarity
+
+    def similarity_if_ready(self):
+        """作り終わっていれば similarity を返し、まだなら作り始めて None を返す。"""
+        self.start_similarity()
+        return self._similarity
+
+    @cached_property
+    def filter_cache(self):
+        return FilterCache(self.store, self.search_index, self.facets)
+
+    @cached_property
+    def detail_cache(self):
+        return DetailCache(self.store)
+
+    @cached_property
+    def question_bank(self):
+        return QuestionBank(self.store)
+
+    @cached_property
+    def export_cache(self):
+        return ExportCache(self.store)
+
+
+class CorpusManager:
+    """ソースを監視して Corpus を差し替える。"""
+
+    def __init__(self, ingestor=None, poll_interval=2.0):
+        self.ingestor = ingestor or GlossaryIngestor()
+        self.poll_interval = poll_interval
+        self.last_error = None
+        # 最後に変化したソースから Corpus を作れなかったときのエラー
+        self._build_error = None
+        self._lock = threading.Lock()
+        self.ingestor.scan()
+        self._corpus = self._build(1)
+        self._corpus.start_similarity()
+        self._checked_at = time.monotonic()
+
+    def _build(self, version, previous=None):
+        doc = self.ingestor.document()
+        return Corpus(TermStore(doc["terms"], doc["categories"]), version, previous)
+
+    def current(self):
+        """最新の Corpus を返す。確認間隔を過ぎていればソースを確認する。"""
+        if time.monotonic() - self._checked_at >= self.poll_interval:
+            self.refresh()
+        return self._corpus
+
+    def refresh(self, force=False):
+        """ソースを確認し、変化があれば新しい Corpus に差し替える。
+
+        ほかのスレッドが確認中なら待たずに戻る（force=True のときは待つ）。
+        ソースに誤りがあるときや読めないときは last_error に記録して今の Corpus を
+        使い続ける（エディタの保存などでファイルが一時的に消えても止まらない）。
+        新しい内容から Corpus や常に使う派生データを作れなかったときも同じで、
+        そのエラーはソースが次に変わるまで last_error に残す。
+        """
+        if not self._lock.acquire(blocking=force):
+            return False
+        try:
+            self._checked_at = time.monotonic()
+            try:
+                changed = self.ingestor.scan()
+            except (ValueError, OSError) as e:
+                # IngestError と、走査中に消えた・読めないファイル
+                self.last_error = str(e)
+                return False
+            if not changed:
+                self.last_error = self._build_error
+                return False
+            try:
+                corpus = self._build(self._corpus.version + 1, self._corpus)
+                # 派生データのうち常に使うものは差し替え前に作っておく（類似度は
+                # 重いのでバックグラウンドで作り始めるだけにする）
+                corpus.filter_cache
+            except Exception as e:
+                # スキーマ違反や、派生データを作れない内容
+                self._build_error = self.last_error = str(e) or type(e).__name__
+                return False
+            self._build_error = self.last_error = None
+            corpus.start_similarity()
+            self._corpus = corpus
+            return True
+        finally:
+            self._lock.release()
+
+
+class CorpusRegistry:
+    """ロケールごとの CorpusManager（初めて使われたときに作り、使われなくなったら手放す）。"""
+
+    def __init__(self, locales=None, idle_timeout=IDLE_TIMEOUT, poll_interval=2.0):
+        self.locales = tuple(locales or available_locales())
+        self.idle_timeout = idle_timeout
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._managers = {}  # locale -> CorpusManager
+        self._last_used = {}  # locale -> time.monotonic()
+        # 読み込みはロケールごとに直列化する（ほかのロケールの利用は待たせない）
+        self._loading = {locale: threading.Lock() for locale in self.locales}
+
+    def manager(self, locale):
+        """locale の CorpusManager（読み込んでいなければ読み込む）。"""
+        if locale not in self._loading:
+            raise KeyError(f"未知のロケールです: {locale!r}")
+        with self._lock:
+            self._last_used[locale] = time.monotonic()
+            manager = self._managers.get(locale)
+        if manager is not None:
+            return manager
+        with self._loading[locale]:
+            with self._lock:
+                manager = self._managers.get(locale)
+            if manager is None:
+                manager = CorpusManager(
+                    GlossaryIngestor(default_source(locale)), self.poll_interval
+                )
+                with self._lock:
+                    self._managers[locale] = manager
+                    self._last_used[locale] = time.monotonic()
+        return manager
+
+    def current(self, locale):
+        """locale の最新の Corpus を返し、ついでに使われていないロケールを手放す。"""
+        corpus = self.manager(locale).current()
+        self.evict_idle()
+        return corpus
+
+    def evict_idle(self, now=None):
+        """idle_timeout を過ぎたロケールを手放し、手放したロケールを返す。
+
+        再実行中のセッションは自分の Corpus を参照し続けるので、手放しても
+        その再実行が終わるまでは使える。次に選ばれたときに読み込み直す。
+        """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            idle = [
+                locale
+                for locale in self._managers
+                if now - self._last_used[locale] >= self.idle_timeout
+            ]
+            for locale in idle:
+                del self._managers[locale]
+        return idle
+
+    def loaded(self):
+        """いま読み込んであるロケール。"""
+        with self._lock:
+            return tuple(locale for locale in self.locales if locale in self._managers)
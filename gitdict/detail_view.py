@@ -0,0 +1,71 @@
+"""用語詳細ペインの表示内容。
+
+カテゴリのタグ・用語名・一言説明・詳細説明・使用例は用語ごとに決まるので、
+1つの Markdown（HTML 混じり）にまとめて作り、(コーパスの版, 用語 id) を
+キーにした LRU に持っておく。よく開かれる用語は再実行のたびに組み立て直さず、
+画面にも1つの要素として送るだけで済む。
+
+検索中は一致箇所を <mark> で強調した版を作る。一致位置はキーに含めるので、
+同じ検索語のまま再実行しても組み立て直さない。
+"""
+
+import html
+import re
+
+from gitdict.highlight import html_highlight, html_snippet
+from gitdict.lru import LRUCache
+from gitdict.search_index import field_text
+
+_BACKTICKS = re.compile(r"`+")
+
+
+def _code_block(code, language="bash"):
+    # 本文中のバッククォートより長いフェンスで囲む
+    fence = "`" * max(3, max((len(m) for m in _BACKTICKS.findall(code)), default=0) + 1)
+    return f"{fence}{language}\n{code}\n{fence}"
+
+
+def render_detail_markdown(term, matches=None):
+    """用語詳細ペインの静的な部分（関連用語のボタンより上）の Markdown を返す。
+
+    matches（SearchHit.matches）を渡すと一致箇所を強調する。使用例はコードブロック
+    の中を強調できないので、一致した行の前後を見出しの下に抜き出して示す。
+    """
+    matches = matches or {}
+    parts = [
+        f"<span class='tag'>📌 {html.escape(term.category)}</span>",
+        f"### {html_highlight(term.name, matches.get('name'))}",
+        f"**一言説明：** {html_highlight(term.short_description, matches.get('short_description'))}",
+        "---",
+        "#### 詳細説明",
+        f"""<div style="background-color: #f9fafb; padding: 1rem; border-radius: 0.5rem;">
+  <p style="color: #374151; line-height: 1.75; margin: 0;">
+    {html_highlight(term.full_description, matches.get('full_description'))}
+  </p>
+</div>""",
+    ]
+    if term.examples:
+        parts.append("#### 💻 使用例")
+        if "examples" in matches:
+            snippet = html_snippet(field_text(term, "examples"), matches["examples"])
+            parts.append(f"<div class='hit-snippet'>🔍 {snippet}</div>")
+        parts.extend(_code_block(example) for example in term.examples)
+    return "\n\n".join(parts)
+
+
+class DetailCache:
+    """render_detail_markdown の結果を用語ごとに保持する LRU。"""
+
+    def __init__(self, store, maxsize=512):
+        self.store = store
+        self._cache = LRUCache(maxsize)
+
+    def __call__(self, term_id, matches=None):
+        spans = tuple(sorted(matches.items())) if matches else ()
+        return self._cache.get_or_compute(
+            (self.store.version, term_id, spans),
+            lambda: render_detail_markdown(self.store.get(term_id), matches),
+        )
+
+    def stats(self):
+        return self._cache.stats()
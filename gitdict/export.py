@@ -0,0 +1,171 @@
+"""一覧表のエクスポート（CSV / JSONL / Parquet）。
+
+絞り込み結果の表とダウンロード用データは絞り込み条件をキーにした LRU に
+保持し、ダウンロードが要求されたときにだけ作る。全用語のエクスポートは
+コーパスのバージョンごとに一度だけ、チャンク単位でファイルへ書き出す。
+書き出したファイルは形式ごとに最近使った KEEP_FULL_EXPORTS 個だけを残し、
+ホットリロードで古くなったバージョンのものは消す。
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+
+import pandas as pd
+
+from gitdict.lru import LRUCache
+from gitdict.storage import STATE_DIR
+
+# 表の列名 -> 用語のフィールド名
+TABLE_COLUMNS = {
+    "ID": "id",
+    "用語": "name",
+    "カテゴリ": "category",
+    "一言説明": "short_description",
+}
+
+# 表示名 -> (拡張子, MIME タイプ)
+EXPORT_FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "JSONL": ("jsonl", "application/x-ndjson"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+EXPORT_DIR = STATE_DIR / "exports"
+
+# 形式ごとに残す全用語エクスポートの数（ロケールごとに1つずつ使うので、
+# 同時に使われるロケールの数より少なくしない）
+KEEP_FULL_EXPORTS = 4
+
+CHUNK_SIZE = 5000
+
+
+def build_table(terms):
+    """用語の列から一覧表の DataFrame を作る。"""
+    return pd.DataFrame(
+        [
+            {column: getattr(t, field) for column, field in TABLE_COLUMNS.items()}
+            for t in terms
+        ],
+        columns=list(TABLE_COLUMNS),
+    )
+
+
+def _csv_chunk(df, first):
+    text = df.to_csv(index=False, header=first)
+    return text.encode("utf-8-sig" if first else "utf-8")
+
+
+def _jsonl_chunk(df):
+    lines = (
+        json.dumps(row, ensure_ascii=False) + "\n" for row in df.to_dict("records")
+    )
+    return "".join(lines).encode("utf-8")
+
+
+def export_bytes(df, fmt):
+    """DataFrame を指定形式のバイト列にする。"""
+    if fmt == "CSV":
+        return _csv_chunk(df, first=True)
+    if fmt == "JSONL":
+        return _jsonl_chunk(df)
+    if fmt == "Parquet":
+        return df.to_parquet(index=False)
+    raise ValueError(f"未対応のエクスポート形式です: {fmt!r}")
+
+
+def iter_table_chunks(store, chunk_size=CHUNK_SIZE):
+    """全用語の一覧表を chunk_size 行ずつの DataFrame として順に返す。"""
+    terms = store.terms
+    for start in range(0, len(terms), chunk_size):
+        yield build_table(terms[start : start + chunk_size])
+
+
+def write_full_export(store, fmt, path, chunk_size=CHUNK_SIZE):
+    """全用語を chunk_size 行ずつ path に書き出す（全体をメモリに載せない）。"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+
+    if fmt == "Parquet":
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        writer = None
+        try:
+            for df in iter_table_chunks(store, chunk_size):
+                table = pa.Table.from_pandas(df, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp_path, table.schema)
+                writer.write_table(table)
+            if writer is None:
+                build_table(()).to_parquet(tmp_path, index=False)
+        finally:
+            if writer is not None:
+                writer.close()
+    else:
+        with open(tmp_path, "wb") as f:
+            for i, df in enumerate(iter_table_chunks(store, chunk_size)):
+                if fmt == "CSV":
+                    f.write(_csv_chunk(df, first=i == 0))
+                elif fmt == "JSONL":
+                    f.write(_jsonl_chunk(df))
+                else:
+                    raise ValueError(f"未対応のエクスポート形式です: {fmt!r}")
+
+    # 書き終わってから差し替えるので、読み手が書きかけのファイルを見ることはない
+    os.replace(tmp_path, path)
+    return path
+
+
+def _mtime(path):
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:  # ほかのスレッド・プロセスが先に消した
+        return 0
+
+
+def prune_full_exports(export_dir, ext, keep=KEEP_FULL_EXPORTS):
+    """最近使った keep 個を除いて、ext 形式の全用語エクスポートを消す。"""
+    paths = sorted(Path(export_dir).glob(f"git_terms_*.{ext}"), key=_mtime, reverse=True)
+    for path in paths[keep:]:
+        path.unlink(missing_ok=True)
+
+
+class ExportCache:
+    """一覧表・エクスポートデータのプロセス共有キャッシュ。"""
+
+    def __init__(self, store, export_dir=EXPORT_DIR, maxsize=64):
+        self.store = store
+        self.export_dir = Path(export_dir)
+        self._tables = LRUCache(maxsize)
+        self._payloads = LRUCache(maxsize)
+        self._full_lock = threading.Lock()
+
+    def table(self, filter_key, positions):
+        """絞り込み結果の DataFrame（呼び出し側で書き換えないこと）。"""
+        return self._tables.get_or_compute(
+            filter_key,
+            lambda: build_table(self.store.terms[pos] for pos in positions),
+        )
+
+    def payload(self, filter_key, positions, fmt):
+        """絞り込み結果を fmt 形式にしたバイト列。"""
+        return self._payloads.get_or_compute(
+            (filter_key, fmt),
+            lambda: export_bytes(self.table(filter_key, positions), fmt),
+        )
+
+    def full_export_path(self, fmt):
+        """全用語エクスポートのファイルパス。なければその場で書き出す。"""
+        ext, _ = EXPORT_FORMATS[fmt]
+        path = self.export_dir / f"git_terms_{self.store.version}.{ext}"
+        with self._full_lock:
+            if path.exists():
+                # 使ったことを更新時刻で残す（prune_full_exports で消されないように）
+                os.utime(path)
+            else:
+                write_full_export(self.store, fmt, path)
+                prune_full_exports(self.export_dir, ext)
+        return path
@@ -0,0 +1,70 @@
+"""カテゴリ・応用フラグのブールマスク（ファセット）。
+
+用語の定義順インデックスに沿った NumPy のブール配列をコーパス読み込み時に
+1回だけ作っておき、絞り込みはマスク同士の AND、件数は sum で求める。
+"""
+
+import numpy as np
+
+
+def _frozen(array):
+    # プロセス内で共有するので書き換えられないようにしておく
+    array.setflags(write=False)
+    return array
+
+
+class FacetIndex:
+    """TermStore に対するカテゴリ別・応用フラグのマスク集合。"""
+
+    def __init__(self, store):
+        self.size = len(store)
+        self.categories = store.categories
+        category_codes = {c: code for code, c in enumerate(store.categories)}
+        codes = np.fromiter(
+            (category_codes[t.category] for t in store),
+            dtype=np.int16,
+            count=self.size,
+        )
+        self.category_codes = _frozen(codes)
+        self.category_masks = {
+            category: _frozen(codes == code)
+            for code, category in enumerate(store.categories)
+        }
+        self.advanced_mask = _frozen(
+            np.isin(
+                codes,
+                [
+                    code
+                    for code, category in enumerate(store.categories)
+                    if category in store.advanced_categories
+                ],
+            )
+        )
+        self.all_mask = _frozen(np.ones(self.size, dtype=bool))
+
+    @property
+    def total(self):
+        """登録用語数。"""
+        return int(self.all_mask.sum())
+
+    def non_empty_categories(self, mask=None):
+        """mask（省略時は全体）の中で1件以上あるカテゴリを定義順で返す。"""
+        counts = self.category_counts(self.all_mask if mask is None else mask)
+        return tuple(c for c in self.categories if counts[c])
+
+    def base_mask(self, include_advanced):
+        """カテゴリ指定を除いた絞り込みマスク（応用フラグのみ反映）。"""
+        if include_advanced:
+            return self.all_mask
+        return ~self.advanced_mask
+
+    def category_counts(self, mask):
+        """mask に含まれる用語数をカテゴリ別に数える。"""
+        return {
+            category: int(np.count_nonzero(cat_mask & mask))
+            for category, cat_mask in self.category_masks.items()
+        }
+
+    def order_by_category(self, positions):
+        """positions をカテゴリの定義順に並べ替える（カテゴリ内の順序は保つ）。"""
+        return positions[np.argsort(self.category_codes[positions], kind="stable")]
@@ -0,0 +1,148 @@
+"""フィードバックの保存と集計。
+
+送信内容はキューに積むだけで、書き込みはバックグラウンドのスレッドが
+一定件数・一定間隔ごとにまとめて行う。評価の件数・平均・分布は書き込みと
+同じトランザクションで集計テーブルに足し込み、メモリ上にも同じ値を持つので、
+管理画面からは全件を読み直さずに参照できる。
+"""
+
+import atexit
+import queue
+import threading
+import time
+from collections import namedtuple
+
+from gitdict.storage import connect
+
+RATINGS = (1, 2, 3, 4, 5)
+
+FeedbackSummary = namedtuple("FeedbackSummary", ["count", "mean", "histogram"])
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS feedback (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    user_id TEXT,
+    name TEXT NOT NULL,
+    rating INTEGER NOT NULL,
+    comment TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS feedback_stats (
+    rating INTEGER PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+"""
+
+
+class FeedbackStore:
+    """フィードバックを非同期に追記し、評価の集計を保持するストア。"""
+
+    def __init__(self, path, flush_interval=1.0, batch_size=100):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._conn = connect(path)
+        self._conn.executescript(_SCHEMA)
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._histogram = dict.fromkeys(RATINGS, 0)
+        for rating, count in self._conn.execute(
+            "SELECT rating, count FROM feedback_stats"
+        ):
+            self._histogram[rating] = count
+        self._count = sum(self._histogram.values())
+        self._total = sum(r * c for r, c in self._histogram.items())
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="feedback-writer", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, name, rating, comment, user_id=None):
+        """フィードバックを書き込みキューに積む（すぐに戻る）。"""
+        rating = int(rating)
+        if rating not in RATINGS:
+            raise ValueError(f"評価は 1〜5 で指定してください: {rating!r}")
+        self._queue.put((time.time(), user_id, name, rating, comment))
+
+    def summary(self):
+        """書き込み済みのフィードバックの件数・平均・分布を返す。"""
+        with self._stats_lock:
+            mean = self._total / self._count if self._count else None
+            return FeedbackSummary(self._count, mean, dict(self._histogram))
+
+    def _write(self, batch):
+        added = dict.fromkeys(RATINGS, 0)
+        for _, _, _, rating, _ in batch:
+            added[rating] += 1
+
+        self._conn.execute("BEGIN")
+        try:
+            self._conn.executemany(
+                "INSERT INTO feedback (created_at, user_id, name, rating, comment) "
+                "VALUES (?, ?, ?, ?, ?)",
+                batch,
+            )
+            self._conn.executemany(
+                "INSERT INTO feedback_stats (rating, count) VALUES (?, ?) "
+                "ON CONFLICT (rating) DO UPDATE SET count = count + excluded.count",
+                [(r, c) for r, c in added.items() if c],
+            )
+            self._conn.execute("COMMIT")
+        except Exception:
+            self._conn.execute("ROLLBACK")
+            raise
+
+        with self._stats_lock:
+            for rating, count in added.items():
+                self._histogram[rating] += count
+                self._count += count
+                self._total += rating * count
+
+    def _drain(self, timeout):
+        """キューから最大 batch_size 件を取り出す（最初の1件は timeout まで待つ）。"""
+        try:
+            batch = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while not self._closed:
+            batch = self._drain(timeout=self.flush_interval)
+            if not batch:
+                continue
+            try:
+                self._write(batch)
+            except Exception:
+                # 書き込めなかった分はキューに戻して次の周期で再試行する
+                for item in batch:
+                    self._queue.put(item)
+                time.sleep(self.flush_interval)
+
+    def flush(self):
+        """キューに残っている分をすべて書き出す。"""
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self._write(batch)
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._thread.join(timeout=5)
+        self.flush()
@@ -0,0 +1,84 @@
+"""カテゴリ → 応用除外 → 検索 → 件数制限 の絞り込みパイプライン。
+
+絞り込み結果はサイドバー・検索欄の入力とコーパスのバージョンだけで決まる
+純粋関数なので、メモ入力など無関係なウィジェットによる再実行では
+LRU キャッシュから結果をそのまま返す。
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from gitdict.lru import LRUCache
+from gitdict.search_index import MatchSpans, rank
+from gitdict.textfold import fold
+
+# positions: 表示する用語の位置（TermStore の定義順インデックス）の読み取り専用配列
+# total: 件数制限をかける前のヒット数
+# category_counts: カテゴリ指定を除いた条件でのカテゴリ別ヒット数
+# matches: 位置 -> SearchHit.matches を .get(位置) で引けるもの（検索語があるときは
+#          引かれた行の分だけ一致位置を求める search_index.MatchSpans、ないときは空の dict）
+FilterResult = namedtuple(
+    "FilterResult", ["positions", "total", "category_counts", "matches"]
+)
+
+
+def filter_terms(store, search_index, facets, category, include_advanced, query, max_items):
+    """条件に合う用語を FilterResult で返す。
+
+    category が None のときは全カテゴリ対象。query がある場合は関連度順、
+    ない場合は定義順に並ぶ。関連度順の並べ替えは max_items 件ぶんだけ行う。
+    """
+    base = facets.base_mask(include_advanced)
+
+    scores = search_index.scores(query)
+    facet_mask = base if scores is None else base & (scores > 0)
+
+    category_counts = facets.category_counts(facet_mask)
+    mask = facet_mask
+    if category is not None:
+        mask = mask & facets.category_masks[category]
+
+    total = int(np.count_nonzero(mask))
+    if scores is None:
+        ranked = np.flatnonzero(mask)[:max_items]
+        matches = {}
+    else:
+        ranked = rank(scores, mask, max_items)
+        matches = MatchSpans(search_index, query)
+    ranked.setflags(write=False)
+    return FilterResult(ranked, total, category_counts, matches)
+
+
+class FilterCache:
+    """filter_terms の結果を入力ごとに保持する LRU。"""
+
+    def __init__(self, store, search_index, facets, maxsize=256):
+        self.store = store
+        self.search_index = search_index
+        self.facets = facets
+        self._cache = LRUCache(maxsize)
+
+    def __call__(self, category, include_advanced, query, max_items):
+        key = (
+            self.store.version,
+            category,
+            bool(include_advanced),
+            fold(query.strip()),
+            max_items,
+        )
+        return self._cache.get_or_compute(
+            key,
+            lambda: filter_terms(
+                self.store,
+                self.search_index,
+                self.facets,
+                category,
+                include_advanced,
+                query,
+                max_items,
+            ),
+        )
+
+    def stats(self):
+        return self._cache.stats()
@@ -0,0 +1,108 @@
+"""検索語の一致箇所の強調表示とスニペット。
+
+一致位置は検索時に SearchHit.matches（元の文字列上のオフセット）として
+求めてあるので、ここでは文字列を照合し直さず、その位置の前後を切り出して
+強調の印を付けるだけにする。一覧のボタンには Markdown の太字、
+詳細ペインには HTML の <mark> を使う。
+"""
+
+import html
+import re
+
+from gitdict.search_index import FIELD_WEIGHTS, field_text
+
+# 一致箇所の前後に残す文字数
+SNIPPET_WINDOW = 30
+
+ELLIPSIS = "…"
+
+# ボタンのラベルで Markdown として解釈されうる記号
+_MARKDOWN_SPECIAL = re.compile(r"([\\`*_\[\]<>~|#$])")
+
+
+def escape_markdown(text):
+    return _MARKDOWN_SPECIAL.sub(r"\\\1", text)
+
+
+def best_field(matches, fields=FIELD_WEIGHTS):
+    """一致したフィールドのうち fields の並びで最初のもの（なければ None）。"""
+    return next((field for field in fields if field in matches), None)
+
+
+def snippet_parts(text, span, window=SNIPPET_WINDOW):
+    """一致箇所の前後 window 文字を (前, 一致, 後, 先頭を省いたか, 末尾を省いたか) で返す。
+
+    使用例のように改行でつないだ文字列では、一致した行の中だけを切り出す。
+    window が None なら一致した行全体を切り出す。
+    """
+    start, end = span
+    line_start = text.rfind("\n", 0, start) + 1
+    line_end = text.find("\n", end)
+    line_end = len(text) if line_end < 0 else line_end
+    lo, hi = line_start, line_end
+    if window is not None:
+        lo = max(lo, start - window)
+        hi = min(hi, end + window)
+    return text[lo:start], text[start:end], text[end:hi], lo > line_start, hi < line_end
+
+
+def markdown_snippet(text, span, window=SNIPPET_WINDOW):
+    """一致箇所を太字にした Markdown のスニペット。"""
+    before, hit, after, cut_head, cut_tail = snippet_parts(text, span, window)
+    return "".join(
+        [
+            ELLIPSIS if cut_head else "",
+            escape_markdown(before),
+            f"**{escape_markdown(hit)}**",
+            escape_markdown(after),
+            ELLIPSIS if cut_tail else "",
+        ]
+    )
+
+
+def html_highlight(text, span):
+    """文字列全体をエスケープし、一致箇所を <mark> で囲んだ HTML。"""
+    if span is None:
+        return html.escape(text)
+    start, end = span
+    return (
+        f"{html.escape(text[:start])}<mark>{html.escape(text[start:end])}</mark>"
+        f"{html.escape(text[end:])}"
+    )
+
+
+def html_snippet(text, span, window=SNIPPET_WINDOW):
+    """一致箇所を <mark> で囲んだ HTML のスニペット。"""
+    before, hit, after, cut_head, cut_tail = snippet_parts(text, span, window)
+    return "".join(
+        [
+            ELLIPSIS if cut_head else "",
+            html.escape(before),
+            f"<mark>{html.escape(hit)}</mark>",
+            html.escape(after),
+            ELLIPSIS if cut_tail else "",
+        ]
+    )
+
+
+def list_label(term, matches, window=SNIPPET_WINDOW):
+    """用語一覧のボタンのラベル。
+
+    一致がなければ「用語名：一言説明」のまま。一致があれば用語名の一致を太字にし、
+    説明側は一致したフィールド（一言説明 → 詳細説明 → 使用例の順）の
+    一致箇所の前後を切り出して示す。
+    """
+    if not matches:
+        return f"{term.name}：{term.short_description}"
+
+    if "name" in matches:
+        name = markdown_snippet(term.name, matches["name"], window=None)
+    else:
+        name = escape_markdown(term.name)
+
+    field = best_field(matches, [f for f in FIELD_WEIGHTS if f != "name"])
+    if field is None:
+        description = escape_markdown(term.short_description)
+    else:
+        description = markdown_snippet(field_text(term, field), matches[field], window)
+    return f"{name}：{description}"
@@ -0,0 +1,272 @@
+"""用語集ソースファイルの取り込み。
+
+ディレクトリ内の JSON / YAML / CSV / Markdown を読み、スキーマを検証して
+1つのコーパス（categories + terms）にまとめる。前回から内容のハッシュが
+変わったファイルだけを読み直す。
+
+形式:
+- JSON / YAML: {"categories": [...], "terms": [...]}（どちらも省略可）
+  または用語のリスト
+- CSV: 1行1用語。examples は改行区切り、related_terms はカンマ区切り
+- Markdown: 1ファイル1用語。先頭の front matter（--- で囲んだ key: value）に
+  id / category / related_terms、本文の「# 用語名」の直後の段落が一言説明、
+  続く段落が詳細説明、「## 使用例」の箇条書きが使用例
+"""
+
+import csv
+import hashlib
+import io
+import json
+import os
+from pathlib import Path
+
+from gitdict.term_store import DATA_DIR, DEFAULT_LOCALE, REQUIRED_FIELDS
+
+try:
+    import yaml
+except ImportError:  # YAML のソースを使わないなら PyYAML は不要
+    yaml = None
+
+SUPPORTED_SUFFIXES = (".json", ".yaml", ".yml", ".csv", ".md")
+
+_STRING_FIELDS = ("id", "name", "category", "short_description", "full_description")
+_LIST_FIELDS = ("examples", "related_terms")
+
+
+class IngestError(ValueError):
+    """ソースファイルの読み込み・検証に失敗した。"""
+
+
+def _source_override():
+    return os.environ.get("GITDICT_TERMS_PATH") or os.environ.get("GITDICT_GLOSSARY_DIR")
+
+
+def default_source(locale=DEFAULT_LOCALE):
+    """取り込み元。GITDICT_TERMS_PATH（単一ファイル）、GITDICT_GLOSSARY_DIR、data/<locale>/ の順。"""
+    return Path(_source_override() or DATA_DIR / locale)
+
+
+def available_locales(data_dir=DATA_DIR):
+    """用語データのあるロケール（既定のロケールが先頭）。
+
+    ディレクトリの名前を見るだけで中身は読まない。環境変数で取り込み元を
+    1つに指定しているときは既定のロケールだけ。
+    """
+    if _source_override():
+        return (DEFAULT_LOCALE,)
+    found = sorted(
+        p.name
+        for p in Path(data_dir).iterdir()
+        if p.is_dir() and not p.name.startswith((".", "_"))
+    )
+    return tuple(sorted(found, key=lambda locale: locale != DEFAULT_LOCALE))
+
+
+def validate_term(term, source):
+    """用語 dict がスキーマに合っているか確かめ、問題があれば IngestError を送出する。"""
+    if not isinstance(term, dict):
+        raise IngestError(f"{source}: 用語は key/value の組で書いてください: {term!r}")
+    problems = [f"{f} がありません" for f in REQUIRED_FIELDS if f not in term]
+    for field in _STRING_FIELDS:
+        if field in term and not isinstance(term[field], str):
+            problems.append(f"{field} は文字列にしてください")
+    for field in ("id", "name", "category"):
+        if isinstance(term.get(field), str) and not term[field].strip():
+            problems.append(f"{field} が空です")
+    for field in _LIST_FIELDS:
+        value = term.get(field)
+        if field in term and (
+            not isinstance(value, list) or not all(isinstance(v, str) for v in value)
+        ):
+            problems.append(f"{field} は文字列のリストにしてください")
+    unknown = sorted(set(term) - set(REQUIRED_FIELDS))
+    if unknown:
+        problems.append(f"未知の項目があります: {unknown}")
+    if problems:
+        raise IngestError(f"{source}: 用語 {term.get('id')!r}: " + "、".join(problems))
+
+
+def _split_list(text, separators):
+    for sep in separators[1:]:
+        text = text.replace(sep, separators[0])
+    return [item.strip() for item in text.split(separators[0]) if item.strip()]
+
+
+def _parse_document(doc, source):
+    if isinstance(doc, list):
+        return [], doc
+    if isinstance(doc, dict):
+        return doc.get("categories", []), doc.get("terms", [])
+    raise IngestError(f"{source}: categories / terms を含む形式で書いてください")
+
+
+def parse_json(text, source):
+    try:
+        return _parse_document(json.loads(text), source)
+    except json.JSONDecodeError as e:
+        raise IngestError(f"{source}: JSON として読めません: {e}") from e
+
+
+def parse_yaml(text, source):
+    if yaml is None:
+        raise IngestError(f"{source}: YAML を読むには PyYAML をインストールしてください")
+    try:
+        return _parse_document(yaml.safe_load(text), source)
+    except yaml.YAMLError as e:
+        raise IngestError(f"{source}: YAML として読めません: {e}") from e
+
+
+def parse_csv(text, source):
+    terms = []
+    for row in csv.DictReader(io.StringIO(text)):
+        term = {k: (v or "").strip() for k, v in row.items() if k}
+        term["examples"] = _split_list(term.get("examples", ""), ["\n"])
+        term["related_terms"] = _split_list(term.get("related_terms", ""), [",", " ", "\n"])
+        terms.append(term)
+    return [], terms
+
+
+def parse_markdown(text, source):
+    lines = text.splitlines()
+    meta = {}
+    if lines and lines[0].strip() == "---":
+        try:
+            end = lines.index("---", 1)
+        except ValueError:
+            raise IngestError(f"{source}: front matter が --- で閉じられていません") from None
+        for line in lines[1:end]:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                meta[key.strip()] = value.strip()
+        lines = lines[end + 1 :]
+
+    name = None
+    paragraphs = []
+    examples = []
+    current = []
+    in_examples = False
+    for line in lines + [""]:
+        stripped = line.strip()
+        if stripped.startswith("# ") and name is None:
+            name = stripped[2:].strip()
+        elif stripped.startswith("## "):
+            if current:
+                paragraphs.append(" ".join(current))
+                current = []
+            in_examples = stripped[3:].strip() == "使用例"
+        elif in_examples:
+            if stripped.startswith(("- ", "* ")):
+                examples.append(stripped[2:].strip().strip("`"))
+        elif stripped:
+            current.append(stripped)
+        elif current:
+            paragraphs.append(" ".join(current))
+            current = []
+
+    term = {
+        "id": meta.get("id", ""),
+        "name": name or "",
+        "category": meta.get("category", ""),
+        "short_description": paragraphs[0] if paragraphs else "",
+        "full_description": "\n\n".join(paragraphs[1:]),
+        "examples": examples,
+        "related_terms": _split_list(meta.get("related_terms", ""), [",", " "]),
+    }
+    return [], [term]
+
+
+_PARSERS = {
+    ".json": parse_json,
+    ".yaml": parse_yaml,
+    ".yml": parse_yaml,
+    ".csv": parse_csv,
+    ".md": parse_markdown,
+}
+
+
+def parse_file(path, data):
+    """ファイルの中身を (categories, terms) にして検証する。"""
+    categories, terms = _PARSERS[path.suffix.lower()](data.decode("utf-8-sig"), path)
+    for term in terms:
+        validate_term(term, path)
+    for category in categories:
+        if not isinstance(category, dict) or not isinstance(category.get("name"), str):
+            raise IngestError(f"{path}: カテゴリは name を持つ key/value で書いてください")
+    return categories, terms
+
+
+class GlossaryIngestor:
+    """ソース（ディレクトリまたは単一ファイル）を差分で取り込む。"""
+
+    def __init__(self, source=None):
+        self.source = Path(source) if source is not None else default_source()
+        # path -> (stat の指紋, 内容のハッシュ, (categories, terms))
+        self._files = {}
+        self.parse_count = 0
+
+    def _source_files(self):
+        if self.source.is_file():
+            return [self.source]
+        return sorted(
+            p
+            for p in self.source.rglob("*")
+            if p.is_file()
+            and p.suffix.lower() in SUPPORTED_SUFFIXES
+            and not p.name.startswith(".")
+        )
+
+    def scan(self):
+        """ソースを確認し、前回から変化があれば True を返す。
+
+        mtime とサイズが変わっていないファイルは読まず、読んだファイルも
+        内容のハッシュが同じなら解析し直さない。検証エラーのときは
+        IngestError を送出し、前回の状態を保つ。
+        """
+        files = {}
+        changed = False
+        for path in self._source_files():
+            stat = path.stat()
+            fingerprint = (stat.st_mtime_ns, stat.st_size)
+            previous = self._files.get(path)
+            if previous is not None and previous[0] == fingerprint:
+                files[path] = previous
+                continue
+            data = path.read_bytes()
+            digest = hashlib.sha256(data).hexdigest()
+            if previous is not None and previous[1] == digest:
+                files[path] = (fingerprint, digest, previous[2])
+                continue
+            files[path] = (fingerprint, digest, parse_file(path, data))
+            self.parse_count += 1
+            changed = True
+
+        if set(files) != set(self._files):
+            changed = True
+        if changed:
+            self._check_duplicates(files)
+        self._files = files
+        return changed
+
+    @staticmethod
+    def _check_duplicates(files):
+        seen = {}
+        for path, (_, _, (_, terms)) in files.items():
+            for term in terms:
+                if term["id"] in seen:
+                    raise IngestError(
+                        f"用語IDが重複しています: {term['id']!r}（{seen[term['id']]} と {path}）"
+                    )
+                seen[term["id"]] = path
+
+    def document(self):
+        """取り込み済みの内容を {"categories", "terms"} にまとめて返す。"""
+        categories = []
+        names = set()
+        terms = []
+        for _, _, (file_categories, file_terms) in self._files.values():
+            for category in file_categories:
+                if category["name"] not in names:
+                    names.add(category["name"])
+                    categories.append(category)
+            terms.extend(file_terms)
+        return {"categories": categories, "terms": terms}
@@ -0,0 +1,74 @@
+"""スレッドセーフな上限付き LRU キャッシュ。
+
+Streamlit はセッションごとに別スレッドでスクリプトを実行するため、
+プロセス共有のキャッシュはロックで保護する。
+"""
+
+import threading
+from collections import OrderedDict
+
+_MISSING = object()
+
+
+class LRUCache:
+    """最大 maxsize 件を保持し、古いものから追い出すキャッシュ。"""
+
+    def __init__(self, maxsize=256):
+        if maxsize <= 0:
+            raise ValueError("maxsize は 1 以上を指定してください")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._data.get(key, _MISSING)
+            if value is _MISSING:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key, compute):
+        """キャッシュにあれば返し、なければ compute() の結果を格納して返す。
+
+        compute はロックの外で呼ぶため、同じキーが同時に計算されることはありうる
+        （結果は同じなので後勝ちで問題ない）。
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        """ヒット数などの統計を dict で返す。"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
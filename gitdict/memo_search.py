@@ -0,0 +1,86 @@
+"""ユーザーのメモ・学習ノートの全文検索。
+
+用語の検索（search_index）と同じく、正規化した文字の 1-gram / 2-gram を
+キーにした転置インデックスを使う。ただしメモは書き換わるので posting は
+メモのキーの集合で持ち、メモが編集されたときはそのメモの n-gram だけを
+差し替える（ほかのメモは正規化し直さない）。
+"""
+
+import threading
+from collections import namedtuple
+
+from gitdict.textfold import fold, fold_with_offsets, original_span
+
+NGRAM_SIZES = (1, 2)
+
+# key: メモのキー（用語 id または GLOBAL_NOTE_KEY）
+# text: メモの本文、span: 本文上の一致位置 (開始, 終了)
+MemoHit = namedtuple("MemoHit", ["key", "text", "span"])
+
+
+def _ngrams(text):
+    return {text[i : i + n] for n in NGRAM_SIZES for i in range(len(text) - n + 1)}
+
+
+class MemoIndex:
+    """1人分のメモ {key: text} に対する n-gram 転置インデックス。"""
+
+    def __init__(self, memos=None):
+        self._entries = {}  # key -> (本文, 正規化した本文, 位置の対応表)
+        self._postings = {}  # n-gram -> {key, ...}
+        self._lock = threading.Lock()
+        for key, text in (memos or {}).items():
+            self._add(key, text)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _add(self, key, text):
+        folded, offsets = fold_with_offsets(text)
+        self._entries[key] = (text, folded, offsets)
+        for gram in _ngrams(folded):
+            self._postings.setdefault(gram, set()).add(key)
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        for gram in _ngrams(entry[1]):
+            posting = self._postings[gram]
+            posting.discard(key)
+            if not posting:
+                del self._postings[gram]
+
+    def update(self, key, text):
+        """1件のメモを差し替える（空文字は削除）。"""
+        with self._lock:
+            self._remove(key)
+            if text:
+                self._add(key, text)
+
+    def search(self, query, limit=50):
+        """クエリを含むメモを、一致位置が先頭に近い順の MemoHit リストで返す。"""
+        q = fold(query.strip())
+        if not q:
+            return []
+
+        n = min(len(q), NGRAM_SIZES[-1])
+        hits = []
+        with self._lock:
+            # クエリ中で最もメモの少ない n-gram の posting だけを照合する
+            candidates = None
+            for i in range(len(q) - n + 1):
+                posting = self._postings.get(q[i : i + n])
+                if not posting:
+                    return []
+                if candidates is None or len(posting) < len(candidates):
+                    candidates = posting
+            for key in candidates:
+                text, folded, offsets = self._entries[key]
+                start = folded.find(q)
+                if start >= 0:
+                    span = original_span((start, start + len(q)), offsets)
+                    hits.append(MemoHit(key, text, span))
+
+        hits.sort(key=lambda hit: (hit.span[0], hit.key))
+        return hits[:limit]
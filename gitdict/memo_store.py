@@ -0,0 +1,185 @@
+"""ユーザーごとのメモ・学習ノートの永続化。
+
+書き込みは変更があったものだけをメモリ上の保留分に積み、バックグラウンドの
+スレッドが一定間隔（または一定件数）でまとめて1トランザクションで書き出す。
+同じメモへの連続した編集は保留分の上書きになるので、キー入力のたびに
+ディスク I/O が起きることはない。ユーザーのメモは初めて参照したときに読み込む。
+
+メモの持ち主（user_id）は URL には載せない。保存用のキーから決まる持ち主の
+メモだけを SQLite に書き、セッションごとの id のメモはメモリ上（最近使った
+cache_users 人分）にだけ持つ（storage.is_persistent）。以前の版が書いた、
+もう誰も開けない持ち主のメモは起動時に消す。
+
+メモの全文検索用のインデックス（memo_search.MemoIndex）はユーザーが初めて
+検索したときに作り、それ以降は編集されたメモの分だけを差分で更新する。
+"""
+
+import atexit
+import threading
+import time
+
+from gitdict.lru import LRUCache
+from gitdict.memo_search import MemoIndex
+from gitdict.storage import OWNER_PREFIX, connect, is_persistent
+
+# 学習ノート（用語に紐づかない自由メモ）を保存するキー
+GLOBAL_NOTE_KEY = "@global_note"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS memos (
+    user_id TEXT NOT NULL,
+    key TEXT NOT NULL,
+    text TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    PRIMARY KEY (user_id, key)
+)
+"""
+
+
+class MemoStore:
+    """SQLite に保存するメモストア（書き込みは遅延・一括）。"""
+
+    def __init__(self, path, flush_interval=2.0, batch_size=200, cache_users=1024):
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._conn = connect(path)
+        self._conn.execute(_SCHEMA)
+        self._conn.execute(
+            "DELETE FROM memos WHERE user_id NOT LIKE ? || '%'", (OWNER_PREFIX,)
+        )
+        self._db_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._users = LRUCache(cache_users)  # user_id -> {key: text}
+        self._pending = {}  # (user_id, key) -> (text, updated_at)
+        self._indexes = LRUCache(cache_users)  # user_id -> MemoIndex
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread = threading.Thread(
+            target=self._run, name="memo-store-flusher", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+
+    def load(self, user_id):
+        """ユーザーの全メモを {key: text} で返す（初回のみ DB から読む）。"""
+        memos = self._users.get(user_id)
+        if memos is not None:
+            return memos
+        if not is_persistent(user_id):
+            memos = {}
+            self._users.put(user_id, memos)
+            return memos
+
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT key, text FROM memos WHERE user_id = ?", (user_id,)
+            ).fetchall()
+        memos = dict(rows)
+        with self._lock:
+            # まだ書き出していない編集を読み込んだ内容に重ねる
+            for (pending_user, key), (text, _) in self._pending.items():
+                if pending_user == user_id:
+                    if text:
+                        memos[key] = text
+                    else:
+                        memos.pop(key, None)
+            self._users.put(user_id, memos)
+        return memos
+
+    def get(self, user_id, key, default=""):
+        return self.load(user_id).get(key, default)
+
+    def set(self, user_id, key, text):
+        """メモを更新する。内容が変わらなければ何もせず False を返す。
+
+        空文字はメモの削除として扱う。
+        """
+        memos = self.load(user_id)
+        if memos.get(key, "") == text:
+            return False
+
+        with self._lock:
+            if text:
+                memos[key] = text
+            else:
+                memos.pop(key, None)
+            if is_persistent(user_id):
+                self._pending[(user_id, key)] = (text, time.time())
+            full = len(self._pending) >= self.batch_size
+            index = self._indexes.get(user_id)
+            if index is not None:
+                index.update(key, text)
+        if full:
+            self._wakeup.set()
+        return True
+
+    def adopt(self, source_id, user_id):
+        """source_id のメモを user_id に引き継ぐ（同じキーのメモは上書きする）。"""
+        for key, text in list(self.load(source_id).items()):
+            self.set(user_id, key, text)
+
+    def search(self, user_id, query, limit=50):
+        """ユーザーのメモ・学習ノートからクエリを含むものを MemoHit で返す。"""
+        index = self._indexes.get(user_id)
+        if index is None:
+            memos = self.load(user_id)
+            with self._lock:
+                # 作っている間の編集を取りこぼさないよう、set と同じロックの中で作る
+                index = self._indexes.get(user_id)
+                if index is None:
+                    index = MemoIndex(memos)
+                    self._indexes.put(user_id, index)
+        return index.search(query, limit)
+
+    def flush(self):
+        """保留中の書き込みを1トランザクションでまとめて書き出す。"""
+        with self._lock:
+            if not self._pending:
+                return 0
+            pending, self._pending = self._pending, {}
+
+        upserts = [
+            (user_id, key, text, updated_at)
+            for (user_id, key), (text, updated_at) in pending.items()
+            if text
+        ]
+        deletes = [(user_id, key) for (user_id, key), (text, _) in pending.items() if not text]
+        with self._db_lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany(
+                    "INSERT INTO memos (user_id, key, text, updated_at) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT (user_id, key) DO UPDATE SET "
+                    "text = excluded.text, updated_at = excluded.updated_at",
+                    upserts,
+                )
+                self._conn.executemany(
+                    "DELETE FROM memos WHERE user_id = ? AND key = ?", deletes
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                # 書き込めなかった分は、その後の編集を優先して保留に戻す
+                with self._lock:
+                    for item, value in pending.items():
+                        self._pending.setdefault(item, value)
+                raise
+        return len(pending)
+
+    def _run(self):
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            try:
+                self.flush()
+            except Exception:
+                # 次の周期で再試行する
+                pass
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._thread.join(timeout=5)
+        self.flush()
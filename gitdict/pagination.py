@@ -0,0 +1,17 @@
+"""用語一覧のページ分割。"""
+
+from collections import namedtuple
+
+# number: 0 始まりのページ番号、count: 総ページ数、[start, stop): 表示範囲
+Page = namedtuple("Page", ["number", "count", "start", "stop"])
+
+
+def paginate(total, page, page_size):
+    """total 件を page_size 件ずつに分けたときの page ページ目の範囲を返す。
+
+    page が範囲外のときは最初または最後のページに丸める。
+    """
+    count = max(1, -(-total // page_size))
+    number = min(max(page, 0), count - 1)
+    start = number * page_size
+    return Page(number, count, start, min(start + page_size, total))
@@ -0,0 +1,104 @@
+"""スクリプト再実行（rerun）の区間ごとの計測。
+
+有効なときだけ RerunTimer を使い、区間の区切りで lap() を呼ぶと
+直前の lap からの経過時間をその区間の所要時間として記録する。
+無効なときは何もしない NULL_TIMER を使うので、計測のコストはほぼかからない。
+"""
+
+import json
+import threading
+import time
+from collections import deque
+
+
+def percentile(sorted_values, q):
+    """ソート済みの値列の q パーセンタイル（最近傍法）。"""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+class _NullTimer:
+    enabled = False
+
+    def lap(self, name):
+        pass
+
+    def finish(self):
+        return None
+
+
+NULL_TIMER = _NullTimer()
+
+
+class RerunTimer:
+    """1回の再実行ぶんの計測。"""
+
+    enabled = True
+
+    def __init__(self, profiler):
+        self._profiler = profiler
+        self._started = self._last = time.perf_counter()
+        self.sections = {}
+
+    def lap(self, name):
+        """直前の lap（または開始）からの経過時間を name 区間として記録する。"""
+        now = time.perf_counter()
+        self.sections[name] = self.sections.get(name, 0.0) + (now - self._last) * 1000
+        self._last = now
+
+    def finish(self):
+        """計測を終えてプロファイラに登録し、合計時間（ミリ秒）を返す。"""
+        total = (time.perf_counter() - self._started) * 1000
+        self._profiler.record(total, self.sections)
+        return total
+
+
+class RerunProfiler:
+    """プロセス全体の計測結果（直近 window 回ぶん）を保持する。"""
+
+    def __init__(self, window=500, metrics_path=None):
+        self.window = window
+        self.metrics_path = metrics_path
+        self._lock = threading.Lock()
+        self._samples = {}
+
+    def start(self):
+        return RerunTimer(self)
+
+    def record(self, total, sections):
+        with self._lock:
+            self._append("total", total)
+            for name, elapsed in sections.items():
+                self._append(name, elapsed)
+            if self.metrics_path is not None:
+                line = json.dumps(
+                    {
+                        "ts": time.time(),
+                        "total_ms": round(total, 3),
+                        "sections_ms": {k: round(v, 3) for k, v in sections.items()},
+                    },
+                    ensure_ascii=False,
+                )
+                self.metrics_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.metrics_path, "a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+
+    def _append(self, name, value):
+        samples = self._samples.get(name)
+        if samples is None:
+            samples = self._samples[name] = deque(maxlen=self.window)
+        samples.append(value)
+
+    def summary(self, percentiles=(50, 90, 99)):
+        """区間名 -> {"count", "p50", ...} の dict（ミリ秒）を返す。"""
+        with self._lock:
+            snapshot = {name: sorted(values) for name, values in self._samples.items()}
+        return {
+            name: {
+                "count": len(values),
+                **{f"p{q}": percentile(values, q) for q in percentiles},
+            }
+            for name, values in snapshot.items()
+        }
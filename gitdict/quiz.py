@@ -0,0 +1,91 @@
+"""クイズの問題バンク。
+
+用語から3種類の4択問題を作る。
+
+- name_to_short: 用語名 → 一言説明を選ぶ
+- short_to_name: 一言説明 → 用語名を選ぶ
+- example_to_term: 使用例 → 用語名を選ぶ（使用例のある用語だけ）
+
+誤答の選択肢はコーパス読み込み時にカテゴリごとに決めておき（同じカテゴリの
+用語ほど紛らわしい）、組み立てた問題は LRU に持つので再実行のたびには作らない。
+選択肢の並びは用語と問題の種類から決まるので、同じ問題は毎回同じ順に並ぶ。
+"""
+
+import random
+from collections import namedtuple
+
+from gitdict.lru import LRUCache
+
+QUESTION_KINDS = ("name_to_short", "short_to_name", "example_to_term")
+CHOICES = 4
+
+# choices: (用語 id, 表示する文字列) のタプル、answer: 正解の choices 上の位置
+Question = namedtuple("Question", ["kind", "term_id", "prompt", "choices", "answer"])
+
+
+class QuestionBank:
+    """用語ごとの誤答候補と、組み立て済みの問題。"""
+
+    def __init__(self, store, choices=CHOICES, maxsize=4096):
+        self.store = store
+        self.choices = choices
+        self._cache = LRUCache(maxsize)
+
+        rng = random.Random(store.version)
+        everyone = list(store.ids())
+        rng.shuffle(everyone)
+        self._distractors = {}
+        for category in store.categories:
+            ids = [t.id for t in store.by_category(category)]
+            rng.shuffle(ids)
+            for i, term_id in enumerate(ids):
+                # 同じカテゴリで並びが隣の用語から取り、足りなければ全体から補う
+                picked = [ids[(i + j) % len(ids)] for j in range(1, min(choices, len(ids)))]
+                for other in everyone:
+                    if len(picked) >= choices - 1:
+                        break
+                    if other != term_id and other not in picked:
+                        picked.append(other)
+                self._distractors[term_id] = tuple(picked)
+
+    def kinds(self, term_id):
+        """term_id について出せる問題の種類。"""
+        if self.store.get(term_id).examples:
+            return QUESTION_KINDS
+        return QUESTION_KINDS[:2]
+
+    def question(self, term_id, kind):
+        return self._cache.get_or_compute(
+            (self.store.version, term_id, kind), lambda: self._build(term_id, kind)
+        )
+
+    def _build(self, term_id, kind):
+        term = self.store.get(term_id)
+        rng = random.Random(f"{term_id}:{kind}")
+        if kind == "name_to_short":
+            prompt = f"「{term.name}」の説明として正しいものは？"
+            label = "short_description"
+        elif kind == "short_to_name":
+            prompt = f"「{term.short_description}」にあてはまる用語は？"
+            label = "name"
+        elif kind == "example_to_term":
+            prompt = f"次の使用例に関係する用語は？\n\n`{rng.choice(term.examples)}`"
+            label = "name"
+        else:
+            raise ValueError(f"未知の問題の種類です: {kind!r}")
+
+        answer_text = getattr(term, label)
+        choices = [(term_id, answer_text)]
+        seen = {answer_text}
+        for other_id in self._distractors[term_id]:
+            text = getattr(self.store.get(other_id), label)
+            # 正解と同じ文言の誤答は紛らわしいだけなので除く
+            if text not in seen:
+                seen.add(text)
+                choices.append((other_id, text))
+        rng.shuffle(choices)
+        answer = next(i for i, (cid, _) in enumerate(choices) if cid == term_id)
+        return Question(kind, term_id, prompt, tuple(choices), answer)
+
+    def stats(self):
+        return self._cache.stats()
@@ -0,0 +1,197 @@
+"""クイズの復習スケジュール（間隔反復）と、その永続化。
+
+ユーザーごとに用語の学習状態（次に出す時刻・間隔・易しさ）を持ち、
+次に出す時刻のヒープ（復習キュー）から期限の来た用語を取り出す。
+状態を更新したときは古いヒープの要素を消さずに新しい要素を積み、
+取り出すときに最新の状態と食い違う要素を捨てる（遅延削除）ので、
+次の問題を選ぶのも回答を記録するのも O(log n)。コーパスから消えた用語は
+学習状態を残したまま出題だけ飛ばす。
+
+期限の来た用語がなければ、まだ出していない用語を定義順に1つずつ出す。
+回答は1件ずつ SQLite に書き込む（回答は人の操作の速さでしか起きない）。
+書き込むのは保存用のキーから決まる持ち主の分だけで、セッションごとの id の
+学習状態はメモリ上にだけ持つ（storage.is_persistent）。
+"""
+
+import heapq
+import threading
+import time
+from collections import namedtuple
+
+from gitdict.lru import LRUCache
+from gitdict.storage import OWNER_PREFIX, connect, is_persistent
+
+# 最初に正解したとき・間違えたときの次の出題までの間隔（秒）
+FIRST_INTERVAL = 10 * 60
+RETRY_INTERVAL = 60
+
+INITIAL_EASE = 2.5
+MIN_EASE = 1.3
+MAX_EASE = 3.0
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quiz_cards (
+    user_id TEXT NOT NULL,
+    term_id TEXT NOT NULL,
+    due REAL NOT NULL,
+    interval REAL NOT NULL,
+    ease REAL NOT NULL,
+    reps INTEGER NOT NULL,
+    lapses INTEGER NOT NULL,
+    PRIMARY KEY (user_id, term_id)
+)
+"""
+
+# due: 次に出す時刻（UNIX 秒）、reps: 連続正解数、lapses: 間違えた回数
+CardState = namedtuple("CardState", ["due", "interval", "ease", "reps", "lapses"])
+
+
+def review(state, correct, now):
+    """回答の結果から次の学習状態を返す（state が None なら初めての回答）。"""
+    if state is None:
+        state = CardState(now, 0.0, INITIAL_EASE, 0, 0)
+    if correct:
+        interval = FIRST_INTERVAL if state.reps == 0 else state.interval * state.ease
+        return CardState(
+            now + interval,
+            interval,
+            min(MAX_EASE, state.ease + 0.1),
+            state.reps + 1,
+            state.lapses,
+        )
+    return CardState(
+        now + RETRY_INTERVAL,
+        RETRY_INTERVAL,
+        max(MIN_EASE, state.ease - 0.2),
+        0,
+        state.lapses + 1,
+    )
+
+
+class ReviewQueue:
+    """1人分の学習状態と、次に出す時刻順のヒープ。"""
+
+    def __init__(self, states=None):
+        self.states = dict(states or {})
+        self._heap = [(s.due, term_id) for term_id, s in self.states.items()]
+        heapq.heapify(self._heap)
+        self._lock = threading.Lock()
+        self._new_cursor = 0
+
+    def __len__(self):
+        return len(self.states)
+
+    def _top(self, store):
+        # 状態が更新された要素は捨て、今のコーパスにない用語は飛ばして先頭を返す
+        # （飛ばした要素はヒープに戻すので、用語が戻ればまた出題される）
+        skipped = []
+        top = None
+        while self._heap:
+            due, term_id = self._heap[0]
+            state = self.states.get(term_id)
+            if state is None or state.due != due:
+                heapq.heappop(self._heap)
+            elif term_id not in store:
+                skipped.append(heapq.heappop(self._heap))
+            else:
+                top = self._heap[0]
+                break
+        for entry in skipped:
+            heapq.heappush(self._heap, entry)
+        return top
+
+    def next_card(self, store, now=None):
+        """次に出す用語の id。期限の来た用語も新しい用語もなければ None。"""
+        now = time.time() if now is None else now
+        with self._lock:
+            top = self._top(store)
+            if top is not None and top[0] <= now:
+                return top[1]
+            ids = store.ids()
+            if self._new_cursor > len(ids):
+                self._new_cursor = 0
+            while self._new_cursor < len(ids):
+                term_id = ids[self._new_cursor]
+                if term_id not in self.states:
+                    return term_id
+                self._new_cursor += 1
+            return None
+
+    def next_due(self, store):
+        """期限待ちの用語のうち最も早い時刻（なければ None）。"""
+        with self._lock:
+            top = self._top(store)
+        return None if top is None else top[0]
+
+    def record(self, term_id, correct, now=None):
+        """回答を記録して新しい学習状態を返す。"""
+        now = time.time() if now is None else now
+        with self._lock:
+            state = review(self.states.get(term_id), correct, now)
+            self.states[term_id] = state
+            heapq.heappush(self._heap, (state.due, term_id))
+        return state
+
+
+class QuizStore:
+    """ユーザーごとの ReviewQueue を SQLite に保存する。"""
+
+    def __init__(self, path, cache_users=1024):
+        self._conn = connect(path)
+        self._conn.execute(_SCHEMA)
+        # 以前の版が書いた、もう誰も開けない持ち主の学習状態を消す
+        self._conn.execute(
+            "DELETE FROM quiz_cards WHERE user_id NOT LIKE ? || '%'", (OWNER_PREFIX,)
+        )
+        self._db_lock = threading.Lock()
+        self._queues = LRUCache(cache_users)
+
+    def queue(self, user_id):
+        """ユーザーの復習キュー（初回のみ DB から読む）。"""
+        queue = self._queues.get(user_id)
+        if queue is not None:
+            return queue
+        if not is_persistent(user_id):
+            queue = ReviewQueue()
+            self._queues.put(user_id, queue)
+            return queue
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT term_id, due, interval, ease, reps, lapses "
+                "FROM quiz_cards WHERE user_id = ?",
+                (user_id,),
+            ).fetchall()
+        queue = ReviewQueue({row[0]: CardState(*row[1:]) for row in rows})
+        self._queues.put(user_id, queue)
+        return queue
+
+    def record(self, user_id, term_id, correct, now=None):
+        """回答を記録して保存し、新しい学習状態を返す。"""
+        state = self.queue(user_id).record(term_id, correct, now)
+        self._save(user_id, [(term_id, state)])
+        return state
+
+    def adopt(self, source_id, user_id):
+        """source_id の学習状態を user_id に引き継ぐ（同じ用語の状態は上書きする）。"""
+        states = dict(self.queue(source_id).states)
+        queue = ReviewQueue({**self.queue(user_id).states, **states})
+        self._queues.put(user_id, queue)
+        self._save(user_id, states.items())
+
+    def _save(self, user_id, states):
+        if not is_persistent(user_id):
+            return
+        with self._db_lock:
+            self._conn.executemany(
+                "INSERT INTO quiz_cards "
+                "(user_id, term_id, due, interval, ease, reps, lapses) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (user_id, term_id) DO UPDATE SET "
+                "due = excluded.due, interval = excluded.interval, ease = excluded.ease, "
+                "reps = excluded.reps, lapses = excluded.lapses",
+                [(user_id, term_id, *state) for term_id, state in states],
+            )
+
+    def close(self):
+        with self._db_lock:
+            self._conn.close()
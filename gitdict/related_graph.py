@@ -0,0 +1,80 @@
+"""関連用語のグラフ。
+
+related_terms の参照をコーパス読み込み時に一度だけ解決して隣接リストにする。
+未登録の id への参照（リンク切れ）と逆向きの参照（参照元）も同時に集計する。
+"""
+
+from collections import namedtuple
+
+from gitdict.lru import LRUCache
+
+# hops: 起点からの距離、ids: その距離にある用語 id（発見順）
+HopLayer = namedtuple("HopLayer", ["hops", "ids"])
+
+
+class RelatedGraph:
+    """TermStore の related_terms から作る有向グラフ。"""
+
+    def __init__(self, store, cache_size=512):
+        self._neighbors = {}
+        self._missing = {}
+        referenced_by = {term_id: [] for term_id in store.ids()}
+        unresolved = {}
+
+        for term in store:
+            resolved = []
+            missing = []
+            seen = set()
+            for target in term.related_terms:
+                if target in seen or target == term.id:
+                    continue
+                seen.add(target)
+                if target in store:
+                    resolved.append(target)
+                    referenced_by[target].append(term.id)
+                else:
+                    missing.append(target)
+                    unresolved.setdefault(target, []).append(term.id)
+            self._neighbors[term.id] = tuple(resolved)
+            if missing:
+                self._missing[term.id] = tuple(missing)
+
+        self._referenced_by = {k: tuple(v) for k, v in referenced_by.items()}
+        # 未登録 id -> それを参照している用語 id
+        self.unresolved = {k: tuple(v) for k, v in sorted(unresolved.items())}
+        self._neighborhoods = LRUCache(cache_size)
+
+    def neighbors(self, term_id):
+        """term_id から参照している登録済みの用語 id。"""
+        return self._neighbors.get(term_id, ())
+
+    def referenced_by(self, term_id):
+        """term_id を関連用語に挙げている用語 id。"""
+        return self._referenced_by.get(term_id, ())
+
+    def missing_links(self, term_id):
+        """term_id の related_terms のうち、未登録の id。"""
+        return self._missing.get(term_id, ())
+
+    def neighborhood(self, term_id, max_hops):
+        """term_id から max_hops 以内でたどれる用語を距離ごとに返す（BFS）。"""
+        return self._neighborhoods.get_or_compute(
+            (term_id, max_hops), lambda: self._bfs(term_id, max_hops)
+        )
+
+    def _bfs(self, term_id, max_hops):
+        visited = {term_id}
+        frontier = [term_id]
+        layers = []
+        for hops in range(1, max_hops + 1):
+            next_frontier = []
+            for current in frontier:
+                for neighbor in self._neighbors.get(current, ()):
+                    if neighbor not in visited:
+                        visited.add(neighbor)
+                        next_frontier.append(neighbor)
+            if not next_frontier:
+                break
+            layers.append(HopLayer(hops, tuple(next_frontier)))
+            frontier = next_frontier
+        return tuple(layers)
@@ -0,0 +1,261 @@
+"""文字 n-gram の転置インデックスによる全文検索。
+
+日本語は単語境界がないため、形態素解析ではなく文字の 1-gram / 2-gram を
+キーにする。本文もクエリも textfold.fold で正規化（NFKC・大文字小文字・
+カタカナ/ひらがな）してから扱い、本文の正規化は構築時に1回だけ行う。
+
+posting は n-gram ごとの用語位置の昇順の NumPy 配列で、構築時にフィールドの
+全文字をまとめて配列にし、(n-gram, 位置) の組を1つの整数として1回の並べ替えで
+作る（2-gram のキーは 42 ビットに収まるので、用語数 2**22 件まで扱える）。
+1〜2文字のクエリは posting がそのまま答えになり、3文字以上のクエリは
+クエリ中のすべての 2-gram の posting の共通部分だけを部分文字列で照合する。
+スコアは用語数ぶんの配列に足し込み、並べ替えは表示する件数ぶんだけ行う。
+
+一致位置は元の（正規化前の）フィールド文字列上のオフセットで返す。求めるのは
+表示する行だけで、正規化で長さの変わる本文は構築時に持っておいた位置の
+対応表で元の位置に直す。
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from gitdict.textfold import fold, fold_with_offsets, original_span
+
+# フィールドごとの重み（大きいほど上位に並ぶ）
+FIELD_WEIGHTS = {
+    "name": 4.0,
+    "short_description": 2.0,
+    "full_description": 1.0,
+    "examples": 1.0,
+}
+
+# 先頭一致したときの加点（フィールド重みに対する倍率）
+PREFIX_BONUS = 0.5
+
+NGRAM_SIZES = (1, 2)
+
+# rank で1段ずつ取り出すスコアの段数の上限
+RANK_LEVELS = 8
+
+# n-gram のキー: 1-gram はコードポイントそのもの、2-gram は
+# ((1文字目 + 1) << 21) | 2文字目（1-gram のキーと重ならない）
+_CODE_BITS = 21
+_SHIFT = np.uint64(_CODE_BITS)
+_ONE = np.uint64(1)
+# 空の本文の先頭文字として使う、どのキーとも一致しない値
+_NO_GRAM = np.uint64(2**63)
+
+# position: TermStore 上の定義順インデックス
+# matches: {フィールド名: (開始, 終了)}（field_text で取り出した元の文字列上のオフセット）
+SearchHit = namedtuple("SearchHit", ["position", "score", "matches"])
+
+
+def field_text(term, field):
+    """用語の1フィールドを検索対象の文字列として取り出す。"""
+    value = getattr(term, field)
+    if isinstance(value, tuple):
+        return "\n".join(value)
+    return value
+
+
+def _gram_key(gram):
+    if len(gram) == 1:
+        return np.uint64(ord(gram))
+    return np.uint64(((ord(gram[0]) + 1) << _CODE_BITS) | ord(gram[1]))
+
+
+def _codes(texts):
+    # 全文字のコードポイントと、各文字がどの用語のものか
+    codes = np.frombuffer("".join(texts).encode("utf-32-le"), dtype=np.uint32)
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    owners = np.repeat(np.arange(len(texts), dtype=np.int32), lengths)
+    return codes.astype(np.uint64), owners, lengths
+
+
+def _intersect(a, b):
+    """昇順・重複なしの配列同士の共通部分（a が短いほど速い）。"""
+    if len(b) == 0:
+        return b
+    idx = np.searchsorted(b, a)
+    idx[idx == len(b)] = 0
+    return a[b[idx] == a]
+
+
+def rank(scores, mask, limit=None):
+    """mask の用語を (スコアの降順, 位置の昇順) に並べ、先頭 limit 件の位置を返す。
+
+    スコアは重みの和なので取りうる値は少ない。limit 件が埋まるまで最高点の
+    用語を取り出していき、RANK_LEVELS 段で埋まらなければ limit 番目の
+    スコアを境に候補を絞ってから並べる。
+    """
+    remaining = np.where(mask, scores, 0.0)
+    if limit is not None:
+        picked = []
+        count = 0
+        for _ in range(RANK_LEVELS):
+            top = remaining.max() if len(remaining) else 0.0
+            if top <= 0:
+                return np.concatenate(picked) if picked else np.flatnonzero(remaining)
+            level = np.flatnonzero(remaining == top)
+            picked.append(level[: limit - count])
+            count += len(picked[-1])
+            if count >= limit:
+                return np.concatenate(picked)
+            remaining[level] = 0.0
+
+    positions = np.flatnonzero(remaining)
+    s = remaining[positions]
+    need = None if limit is None else limit - count
+    if need is not None and need < len(positions):
+        kth = np.partition(s, len(s) - need)[len(s) - need]
+        above = s > kth
+        tie = s == kth
+        # 境目と同点の用語は位置の小さいものから残す
+        keep = above | (tie & (np.cumsum(tie) <= need - np.count_nonzero(above)))
+        positions, s = positions[keep], s[keep]
+    ranked = positions[np.lexsort((positions, -s))]
+    return ranked if limit is None else np.concatenate(picked + [ranked])
+
+
+class _FieldIndex:
+    """1フィールド分の posting（n-gram のキー → 用語位置の昇順配列）。"""
+
+    def __init__(self, texts):
+        codes, owners, lengths = _codes(texts)
+        # 同じ用語の中で隣り合う2文字だけを 2-gram にする
+        same = owners[:-1] == owners[1:]
+        bigrams = ((codes[:-1] + _ONE) << _SHIFT | codes[1:])[same]
+        keys = np.concatenate([codes, bigrams])
+        docs = np.concatenate([owners, owners[:-1][same]]).astype(np.uint64)
+
+        # (キー, 用語位置) を1つの整数にまとめて並べ、重複を除く
+        doc_bits = np.uint64(max(1, (len(texts) - 1).bit_length()))
+        pairs = np.unique(keys << doc_bits | docs)
+        keys = pairs >> doc_bits
+        docs = (pairs & ((_ONE << doc_bits) - _ONE)).astype(np.int32)
+
+        if len(keys):
+            starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+        else:
+            # どの用語もこのフィールドが空（posting なし、どのクエリにも一致しない）
+            starts = np.zeros(0, dtype=np.intp)
+        self._keys = keys[starts]
+        self._bounds = np.r_[starts, len(keys)]
+        self._docs = docs
+
+        # 先頭一致の判定用に、各用語の先頭の 1-gram / 2-gram のキー
+        heads = np.cumsum(lengths) - lengths
+        padded = np.r_[codes, np.zeros(2, dtype=np.uint64)]
+        first, second = padded[heads], padded[heads + 1]
+        self.first = np.where(lengths >= 1, first, _NO_GRAM)
+        self.first_two = np.where(lengths >= 2, (first + _ONE) << _SHIFT | second, _NO_GRAM)
+
+    def posting(self, gram):
+        key = _gram_key(gram)
+        i = np.searchsorted(self._keys, key)
+        if i == len(self._keys) or self._keys[i] != key:
+            return self._docs[:0]
+        return self._docs[self._bounds[i] : self._bounds[i + 1]]
+
+
+class SearchIndex:
+    """TermStore 全体に対する n-gram 転置インデックス。"""
+
+    def __init__(self, store, field_weights=None):
+        self.field_weights = dict(field_weights or FIELD_WEIGHTS)
+        self.size = len(store)
+        self._texts = {}
+        # 正規化で長さの変わった本文だけ {フィールド名: {位置: 対応表}} に持つ
+        self._offsets = {}
+        self._fields = {}
+
+        for field in self.field_weights:
+            texts = []
+            offsets = {}
+            for pos, term in enumerate(store):
+                text, mapping = fold_with_offsets(field_text(term, field))
+                if mapping is not None:
+                    offsets[pos] = mapping
+                texts.append(text)
+            self._texts[field] = texts
+            self._offsets[field] = offsets
+            self._fields[field] = _FieldIndex(texts)
+
+    def _matching(self, field, q):
+        """field に q を含む用語の位置（昇順）と、そのうち先頭一致する位置。"""
+        index = self._fields[field]
+        if len(q) <= NGRAM_SIZES[-1]:
+            # posting と先頭の n-gram がそのまま答え（照合は不要）
+            heads = index.first if len(q) == 1 else index.first_two
+            return index.posting(q), np.flatnonzero(heads == _gram_key(q))
+
+        # すべての 2-gram を含む用語に絞ってから部分文字列で照合する
+        grams = {q[i : i + 2] for i in range(len(q) - 1)}
+        postings = sorted((index.posting(gram) for gram in grams), key=len)
+        candidates = postings[0]
+        for posting in postings[1:]:
+            if len(candidates) == 0:
+                break
+            candidates = _intersect(candidates, posting)
+        texts = self._texts[field]
+        hits = np.fromiter(
+            (pos for pos in candidates.tolist() if q in texts[pos]), dtype=np.intp
+        )
+        maybe_prefix = np.flatnonzero(index.first_two == _gram_key(q[:2]))
+        prefix = np.fromiter(
+            (pos for pos in maybe_prefix.tolist() if texts[pos].startswith(q)), dtype=np.intp
+        )
+        return hits, prefix
+
+    def scores(self, query):
+        """用語ごとの関連度の配列（一致しない用語は 0）。クエリが空なら None。"""
+        q = fold(query.strip())
+        if not q:
+            return None
+        scores = np.zeros(self.size, dtype=np.float64)
+        for field, weight in self.field_weights.items():
+            hits, prefix = self._matching(field, q)
+            scores[hits] += weight
+            scores[prefix] += weight * PREFIX_BONUS
+        return scores
+
+    def spans(self, query, position):
+        """1件の用語について {フィールド名: (開始, 終了)} を求める（一致なしなら空）。"""
+        q = fold(query.strip())
+        spans = {}
+        if not q:
+            return spans
+        for field in self.field_weights:
+            start = self._texts[field][position].find(q)
+            if start >= 0:
+                spans[field] = original_span(
+                    (start, start + len(q)), self._offsets[field].get(position)
+                )
+        return spans
+
+    def search(self, query, limit=None):
+        """クエリに一致する用語を関連度順の SearchHit リストで返す（一致位置は返す分だけ求める）。"""
+        scores = self.scores(query)
+        if scores is None:
+            return []
+        ranked = rank(scores, scores > 0, limit)
+        return [
+            SearchHit(int(pos), float(scores[pos]), self.spans(query, pos)) for pos in ranked
+        ]
+
+
+class MatchSpans:
+    """検索結果の行ごとの一致位置。求められた行の分だけ求めて覚えておく。"""
+
+    def __init__(self, search_index, query):
+        self._index = search_index
+        self._query = query
+        self._spans = {}
+
+    def get(self, position, default=None):
+        position = int(position)
+        spans = self._spans.get(position)
+        if spans is None:
+            spans = self._spans[position] = self._index.spans(self._query, position)
+        return spans or default
@@ -0,0 +1,315 @@
+"""説明文の似ている用語（TF-IDF の近傍）。
+
+一言説明・詳細説明・使用例を正規化して文字 n-gram に分け、TF-IDF の
+ベクトル（L2 正規化済み）を作る。n-gram から用語への転置リストで
+コサイン類似度を求め、用語ごとに上位 k 件の近傍を (n, k) の配列に
+持っておくので、画面からの引き当ては O(k)。
+
+近傍の候補は各用語の珍しい（IDF の大きい）n-gram から順に転置リストを
+たどって集め、たどった件数が上限に達したら打ち切る。候補を絞ってから全
+n-gram の内積で類似度を計算し直すので、小さなコーパスでは厳密な近傍になり、
+件数が増えてもありふれた n-gram の長い転置リストはたどらずに済む。内積は
+n-gram 番号の二分探索で疎なまま求め、語彙の大きさの配列は作らない。
+
+コーパスが更新されたときは、用語の並びが同じで変わった用語が少なければ
+updated() で差分だけ計算し直す。IDF は最後に全体を作り直したときの値を
+使い続ける（新しく現れた n-gram はその時点の件数で IDF を決める）。そのため
+差分更新の結果が全体の作り直しと一致するのは、n-gram ごとの出現する用語数が
+変わらない更新を、候補を打ち切らずに（candidate_postings と rerank_candidates を
+None にして）行ったときになる。
+"""
+
+import copy
+import math
+from collections import Counter
+
+import numpy as np
+
+from gitdict.textfold import fold
+
+TEXT_FIELDS = ("short_description", "full_description", "examples")
+NGRAM_SIZE = 2
+TOP_K = 5
+
+# 半数を超える用語に現れる n-gram は似ているかどうかの手がかりにならないので捨てる
+MAX_DF_RATIO = 0.5
+
+# 候補集めでたどる転置リストの延べ件数の上限と、類似度を計算し直す候補の数
+# （SimilarityIndex に None を渡すと打ち切らず、厳密な近傍になる）
+CANDIDATE_POSTINGS = 1000
+RERANK_CANDIDATES = 50
+
+# 変わった用語がこの割合を超えたら差分ではなく全体を作り直す
+REBUILD_RATIO = 0.1
+
+_EMPTY_IDS = np.zeros(0, dtype=np.int32)
+_EMPTY_WEIGHTS = np.zeros(0, dtype=np.float32)
+
+
+def term_text(term):
+    """類似度の計算に使うテキスト。"""
+    parts = []
+    for field in TEXT_FIELDS:
+        value = getattr(term, field)
+        parts.extend(value if isinstance(value, tuple) else (value,))
+    return "\n".join(parts)
+
+
+def char_ngrams(text):
+    """正規化したテキストの文字 n-gram を数える（空白はまたがない）。"""
+    counts = Counter()
+    for token in fold(text).split():
+        if len(token) <= NGRAM_SIZE:
+            counts[token] += 1
+            continue
+        for i in range(len(token) - NGRAM_SIZE + 1):
+            counts[token[i : i + NGRAM_SIZE]] += 1
+    return counts
+
+
+def _frozen(array):
+    array.setflags(write=False)
+    return array
+
+
+class SimilarityIndex:
+    """用語ごとの TF-IDF ベクトルと上位 k 件の近傍。"""
+
+    def __init__(
+        self,
+        store,
+        k=TOP_K,
+        candidate_postings=CANDIDATE_POSTINGS,
+        rerank_candidates=RERANK_CANDIDATES,
+    ):
+        self.k = k
+        self.candidate_postings = candidate_postings
+        self.rerank_candidates = rerank_candidates
+        self.size = len(store)
+        self._store = store
+        counts = [char_ngrams(term_text(term)) for term in store]
+
+        df = Counter()
+        for c in counts:
+            df.update(c.keys())
+        max_df = max(1, int(self.size * MAX_DF_RATIO))
+        self._vocab = {}
+        self._idf = []
+        stop_grams = set()
+        for gram, n in df.items():
+            if n <= max_df or self.size <= 2:
+                self._vocab[gram] = len(self._idf)
+                self._idf.append(self._idf_value(n))
+            else:
+                stop_grams.add(gram)
+        self._stop_grams = frozenset(stop_grams)
+
+        self._vectors = [self._vectorize(c) for c in counts]
+        self._postings = self._build_postings(self._vectors)
+        self._neighbors = np.full((self.size, k), -1, dtype=np.int32)
+        self._scores = np.zeros((self.size, k), dtype=np.float32)
+        for pos in range(self.size):
+            self._set_row(pos)
+        self._freeze()
+
+    def _idf_value(self, df):
+        return math.log((1 + self.size) / (1 + df)) + 1.0
+
+    def _vectorize(self, counts):
+        """n-gram の出現数を IDF の大きい順の (n-gram 番号, 重み) の配列にする。
+
+        未知の n-gram は語彙に足す。
+        """
+        grams = []
+        weights = []
+        for gram, tf in counts.items():
+            if gram in self._stop_grams:
+                continue
+            gid = self._vocab.get(gram)
+            if gid is None:
+                gid = self._vocab[gram] = len(self._idf)
+                self._idf.append(self._idf_value(1))
+            grams.append(gid)
+            weights.append((1.0 + math.log(tf)) * self._idf[gid])
+        if not grams:
+            return _EMPTY_IDS, _EMPTY_WEIGHTS
+        weights = np.array(weights, dtype=np.float32)
+        weights /= np.linalg.norm(weights)
+        idf = np.array([self._idf[gid] for gid in grams], dtype=np.float32)
+        order = np.lexsort((-weights, -idf))
+        return np.array(grams, dtype=np.int32)[order], weights[order]
+
+    @staticmethod
+    def _build_postings(vectors):
+        postings = {}
+        for pos, (grams, weights) in enumerate(vectors):
+            for gid, w in zip(grams.tolist(), weights.tolist()):
+                postings.setdefault(gid, ([], []))
+                postings[gid][0].append(pos)
+                postings[gid][1].append(w)
+        return {
+            gid: (np.array(docs, dtype=np.int32), np.array(ws, dtype=np.float32))
+            for gid, (docs, ws) in postings.items()
+        }
+
+    def _similarities(self, pos):
+        """pos に似ている候補の用語と、そのコサイン類似度（pos 自身を除く）。"""
+        grams, weights = self._vectors[pos]
+        docs = []
+        partial = []
+        visited = 0
+        for gid, w in zip(grams.tolist(), weights.tolist()):
+            if self.candidate_postings is not None and visited >= self.candidate_postings:
+                break
+            posting = self._postings.get(gid)
+            if posting is not None:
+                docs.append(posting[0])
+                partial.append(posting[1] * w)
+                visited += len(posting[0])
+        if not docs:
+            return _EMPTY_IDS, _EMPTY_WEIGHTS
+        docs, inverse = np.unique(np.concatenate(docs), return_inverse=True)
+        partial = np.bincount(inverse, weights=np.concatenate(partial))
+        keep = docs != pos
+        docs, partial = docs[keep], partial[keep]
+        limit = self.rerank_candidates
+        if limit is not None and len(docs) > limit:
+            docs = docs[np.argpartition(-partial, limit - 1)[:limit]]
+        if not len(docs):
+            return _EMPTY_IDS, _EMPTY_WEIGHTS
+
+        # 候補だけ全 n-gram の内積で計算し直す（n-gram 番号の昇順に並べた自分の
+        # ベクトルから、候補の各 n-gram を二分探索で引く）
+        order = np.argsort(grams)
+        sorted_grams, sorted_weights = grams[order], weights[order]
+        candidates = [self._vectors[d] for d in docs.tolist()]
+        offsets = np.cumsum([0] + [len(g) for g, _ in candidates[:-1]])
+        other_grams = np.concatenate([g for g, _ in candidates])
+        idx = np.searchsorted(sorted_grams, other_grams)
+        idx[idx == len(sorted_grams)] = 0
+        products = np.where(
+            sorted_grams[idx] == other_grams,
+            sorted_weights[idx] * np.concatenate([w for _, w in candidates]),
+            0.0,
+        )
+        return docs, np.add.reduceat(products, offsets).astype(np.float32)
+
+    def _set_row(self, pos):
+        docs, scores = self._similarities(pos)
+        k = min(self.k, len(docs))
+        self._neighbors[pos] = -1
+        self._scores[pos] = 0.0
+        if k == 0:
+            return
+        top = np.argpartition(-scores, k - 1)[:k] if len(docs) > k else np.arange(k)
+        # 類似度の高い順、同点なら定義順
+        top = top[np.lexsort((docs[top], -scores[top]))]
+        self._neighbors[pos, :k] = docs[top]
+        self._scores[pos, :k] = scores[top]
+
+    def _insert(self, row, pos, score):
+        """近傍の行 row に pos を類似度の順を保って入れる（溢れた末尾は捨てる）。"""
+        neighbors = self._neighbors[row]
+        scores = self._scores[row]
+        for i in range(self.k):
+            if neighbors[i] < 0 or score > scores[i] or (score == scores[i] and pos < neighbors[i]):
+                neighbors[i + 1 :] = neighbors[i:-1].copy()
+                scores[i + 1 :] = scores[i:-1].copy()
+                neighbors[i] = pos
+                scores[i] = score
+                return
+
+    def _freeze(self):
+        _frozen(self._neighbors)
+        _frozen(self._scores)
+
+    def updated(self, store):
+        """新しいコーパス store に合わせた SimilarityIndex を返す（自分は変えない）。
+
+        用語の並びが同じなら、説明文が変わった用語のベクトルと、その用語を
+        近傍に持つ行だけを計算し直す。用語が増減したときや変わった用語が
+        多いときは全体を作り直す。
+        """
+        if store.ids() != self._store.ids():
+            return self._rebuilt(store)
+        changed = [
+            pos
+            for pos, (old, new) in enumerate(zip(self._store, store))
+            if any(getattr(old, f) != getattr(new, f) for f in TEXT_FIELDS)
+        ]
+        if not changed:
+            index = copy.copy(self)
+            index._store = store
+            return index
+        if len(changed) > self.size * REBUILD_RATIO:
+            return self._rebuilt(store)
+
+        # 共有している配列・辞書は書き換えず、コピーしたものを差し替える
+        index = copy.copy(self)
+        index._store = store
+        index._vocab = dict(self._vocab)
+        index._idf = list(self._idf)
+        index._vectors = list(self._vectors)
+        index._postings = dict(self._postings)
+        index._neighbors = self._neighbors.copy()
+        index._scores = self._scores.copy()
+        index._apply_changes(changed)
+        index._freeze()
+        return index
+
+    def _rebuilt(self, store):
+        return SimilarityIndex(store, self.k, self.candidate_postings, self.rerank_candidates)
+
+    def _apply_changes(self, changed):
+        changed_arr = np.array(changed, dtype=np.int32)
+        grams = set()
+        additions = {}
+        for pos in changed:
+            grams.update(self._vectors[pos][0].tolist())
+            self._vectors[pos] = self._vectorize(char_ngrams(term_text(self._store.terms[pos])))
+            for gid, w in zip(*(a.tolist() for a in self._vectors[pos])):
+                additions.setdefault(gid, ([], []))
+                additions[gid][0].append(pos)
+                additions[gid][1].append(w)
+        grams.update(additions)
+
+        # 転置リストから古いベクトルを外し、新しいベクトルを足す
+        for gid in grams:
+            docs, weights = self._postings.get(gid, (_EMPTY_IDS, _EMPTY_WEIGHTS))
+            keep = ~np.isin(docs, changed_arr)
+            new_docs, new_weights = additions.get(gid, ((), ()))
+            docs = np.concatenate([docs[keep], np.array(new_docs, dtype=np.int32)])
+            weights = np.concatenate([weights[keep], np.array(new_weights, dtype=np.float32)])
+            if len(docs):
+                self._postings[gid] = (docs, weights)
+            else:
+                self._postings.pop(gid, None)
+
+        # 変わった用語と、それを近傍に持っていた用語は行ごと計算し直す
+        recompute = np.isin(self._neighbors, changed_arr).any(axis=1)
+        recompute[changed_arr] = True
+        for pos in np.flatnonzero(recompute).tolist():
+            self._set_row(pos)
+
+        # 残りの行は、変わった用語が今の k 番目より似ていれば差し込む
+        for pos in changed:
+            docs, scores = self._similarities(pos)
+            keep = ~recompute[docs]
+            docs, scores = docs[keep], scores[keep]
+            kth = self._scores[docs, -1]
+            room = (self._neighbors[docs, -1] < 0) | (scores >= kth)
+            for doc, score in zip(docs[room].tolist(), scores[room].tolist()):
+                self._insert(doc, pos, score)
+
+    def neighbors(self, term_id):
+        """term_id に似ている用語の (id, 類似度) を類似度の高い順に返す。"""
+        try:
+            pos = self._store.position(term_id)
+        except KeyError:
+            return []
+        ids = self._store.ids()
+        return [
+            (ids[n], float(s))
+            for n, s in zip(self._neighbors[pos].tolist(), self._scores[pos].tolist())
+            if n >= 0 and s > 0
+        ]
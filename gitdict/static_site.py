@@ -0,0 +1,392 @@
+"""辞典全体を静的な HTML / JSON に書き出す。
+
+用語を開いて読むだけの閲覧は Streamlit のセッションを使わずに済むように、
+用語ごとの詳細ページ（HTML と JSON）と一覧ページ、クライアント側で検索する
+ための小さな索引を出力ディレクトリに書き出す。
+
+ページの内容（用語そのものと、関連用語・参照元・似ている用語の名前）の
+ハッシュを manifest.json に残しておき、2回目以降は内容が変わったページだけを
+書き直す。書き直すページは CPU コア数ぶんのプロセスで並列に描画する。
+
+使い方（リポジトリのルートで）:
+
+    python -m gitdict.static_site --output site
+    python -m gitdict.static_site --locale en --output site/en
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import os
+import sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from urllib.parse import quote
+
+from gitdict.corpus import Corpus
+from gitdict.ingest import GlossaryIngestor, default_source
+from gitdict.search_index import FIELD_WEIGHTS, field_text
+from gitdict.term_store import DEFAULT_LOCALE, TermStore
+from gitdict.textfold import fold
+from gitdict.theme import CSS, WORKFLOW_STEPS, workflow_step_html
+
+# ページの形式を変えたら上げる（上がると全ページを書き直す）
+PAGE_FORMAT = 1
+
+# CSS かページの形式が変わったら全ページを書き直す
+TEMPLATE_HASH = hashlib.sha256(f"{PAGE_FORMAT}\n{CSS}".encode("utf-8")).hexdigest()[:12]
+
+MANIFEST_NAME = "manifest.json"
+SEARCH_INDEX_NAME = "search-index.json"
+TERMS_DIR = "terms"
+
+# 静的ページだけで使う追加の CSS
+_PAGE_CSS = """
+body {
+    font-family: sans-serif;
+    color: #111827;
+    margin: 0 auto;
+    padding: 1.5rem;
+}
+.description {
+    background-color: #f9fafb;
+    padding: 1rem;
+    border-radius: 0.5rem;
+    color: #374151;
+    line-height: 1.75;
+}
+pre {
+    background-color: #f3f4f6;
+    padding: 0.75rem;
+    border-radius: 0.5rem;
+    overflow-x: auto;
+}
+"""
+
+BuildReport = namedtuple("BuildReport", ["rendered", "skipped", "removed"])
+
+
+def page_name(term_id):
+    """用語ページのファイル名（拡張子なし）。"""
+    return quote(term_id, safe="")
+
+
+def _href(term_id):
+    return quote(page_name(term_id)) + ".html"
+
+
+def page_context(corpus, term):
+    """用語ページの描画に使う内容。JSON ページとしてもそのまま書き出す。"""
+    store = corpus.store
+    graph = corpus.related_graph
+    related_ids = graph.neighbors(term.id)
+    return {
+        "term": term.to_dict(),
+        "related": [
+            {
+                "id": rid,
+                "name": store.get(rid).name,
+                "short_description": store.get(rid).short_description,
+            }
+            for rid in related_ids
+        ],
+        "missing_related": list(graph.missing_links(term.id)),
+        "referenced_by": [
+            {"id": rid, "name": store.get(rid).name} for rid in graph.referenced_by(term.id)
+        ],
+        "similar": [
+            {"id": sid, "name": store.get(sid).name, "score": round(score, 2)}
+            for sid, score in corpus.similarity.neighbors(term.id)
+            if sid not in related_ids
+        ],
+    }
+
+
+def context_hash(context):
+    data = json.dumps(context, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(f"{TEMPLATE_HASH}\n{data}".encode("utf-8")).hexdigest()[:16]
+
+
+def _document(title, body, head=""):
+    return f"""<!DOCTYPE html>
+<html lang="ja">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{html.escape(title)}</title>
+<style>{CSS}{_PAGE_CSS}</style>
+{head}
+</head>
+<body class="block-container">
+{body}
+</body>
+</html>
+"""
+
+
+def render_term_page(context):
+    """用語の詳細ページ（アプリの右カラムと同じ構成）の HTML を返す。"""
+    term = context["term"]
+    esc = html.escape
+    parts = [
+        '<p><a href="../index.html">← 用語一覧へ</a></p>',
+        f"<span class='tag'>📌 {esc(term['category'])}</span>",
+        f"<h1>{esc(term['name'])}</h1>",
+        f"<p><strong>一言説明：</strong> {esc(term['short_description'])}</p>",
+        "<hr>",
+        "<h4>詳細説明</h4>",
+        f"<div class='description'>{esc(term['full_description'])}</div>",
+    ]
+    if term["examples"]:
+        parts.append("<h4>💻 使用例</h4>")
+        parts.extend(
+            f"<pre><code>{esc(example)}</code></pre>" for example in term["examples"]
+        )
+    if context["related"] or context["missing_related"]:
+        parts.append("<h4>🔗 関連用語</h4><ul>")
+        parts.extend(
+            f"<li><a href='{_href(r['id'])}'>{esc(r['name'])}</a>："
+            f"{esc(r['short_description'])}</li>"
+            for r in context["related"]
+        )
+        parts.append("</ul>")
+        if context["missing_related"]:
+            parts.append(
+                "<p><small>未登録の関連用語： "
+                + esc(", ".join(context["missing_related"]))
+                + "</small></p>"
+            )
+    if context["similar"]:
+        parts.append("<h4>🧭 似ている用語</h4><ul>")
+        parts.extend(
+            f"<li><a href='{_href(s['id'])}'>{esc(s['name'])}</a>"
+            f"（類似度 {s['score']:.2f}）</li>"
+            for s in context["similar"]
+        )
+        parts.append("</ul>")
+    if context["referenced_by"]:
+        parts.append("<h4>🔙 この用語を参照している用語</h4><ul>")
+        parts.extend(
+            f"<li><a href='{_href(r['id'])}'>{esc(r['name'])}</a></li>"
+            for r in context["referenced_by"]
+        )
+        parts.append("</ul>")
+    parts.append(
+        "<hr><div class='info-box blue'><p style='margin: 0; font-size: 0.875rem;'>"
+        "💬 このページは閲覧用に書き出したものです。メモやクイズはアプリで使えます。"
+        "</p></div>"
+    )
+    return _document(f"{term['name']} - Git用語辞典", "\n".join(parts))
+
+
+def _write_atomic(path, text):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _write_pages(args):
+    """用語ページ（HTML と JSON）をまとめて書き出す。ワーカープロセスで動く。"""
+    terms_dir, contexts = args
+    terms_dir = Path(terms_dir)
+    for context in contexts:
+        name = page_name(context["term"]["id"])
+        _write_atomic(terms_dir / f"{name}.html", render_term_page(context))
+        _write_atomic(
+            terms_dir / f"{name}.json", json.dumps(context, ensure_ascii=False)
+        )
+    return len(contexts)
+
+
+def build_search_index(store):
+    """クライアント側で検索するための索引。
+
+    全フィールドを正規化した文字 2-gram の転置リスト（位置は差分で詰める）と、
+    用語ごとに正規化したフィールドを改行でつないだ本文、並べ替えに使う正規化
+    済みの用語名を持つ。検索はアプリと同じく、正規化した本文にクエリが部分
+    文字列として含まれる用語を返す（2-gram は候補を絞るためだけに使う）。
+    """
+    postings = {}
+    texts = []
+    for pos, term in enumerate(store):
+        grams = set()
+        fields = [fold(field_text(term, field)) for field in FIELD_WEIGHTS]
+        for text in fields:
+            grams.update(text[i : i + 2] for i in range(len(text) - 1))
+        for gram in grams:
+            postings.setdefault(gram, []).append(pos)
+        texts.append("\n".join(fields))
+    for gram, positions in postings.items():
+        postings[gram] = [positions[0]] + [b - a for a, b in zip(positions, positions[1:])]
+    return {
+        "version": store.version,
+        "terms": [[t.id, t.name, t.category, t.short_description] for t in store],
+        "names": [fold(t.name) for t in store],
+        "texts": texts,
+        "grams": postings,
+    }
+
+
+# 正規化は textfold.fold と同じ（NFKC・小文字・カタカナ→ひらがな）
+_SEARCH_SCRIPT = """
+<script>
+function fold(text) {
+  return text.normalize("NFKC").toLowerCase().replace(/[\\u30a1-\\u30f6\\u30fd\\u30fe]/g,
+    (c) => String.fromCharCode(c.charCodeAt(0) - 0x60));
+}
+function decode(deltas) {
+  let pos = 0;
+  return deltas.map((d) => (pos += d));
+}
+let index = null;
+async function search(query) {
+  if (index === null) {
+    index = await (await fetch("search-index.json")).json();
+  }
+  const q = fold(query.trim());
+  const results = document.getElementById("results");
+  results.innerHTML = "";
+  if (!q) return;
+  let hits;
+  if (q.length === 1) {
+    hits = index.texts.flatMap((text, pos) => (text.includes(q) ? [pos] : []));
+  } else {
+    // すべての 2-gram を含む用語に絞ってから、本文に続けて現れるかを確かめる
+    let candidates = null;
+    for (let i = 0; i + 2 <= q.length; i++) {
+      const posting = new Set(decode(index.grams[q.slice(i, i + 2)] || []));
+      candidates =
+        candidates === null ? [...posting] : candidates.filter((pos) => posting.has(pos));
+    }
+    hits = candidates.filter((pos) => index.texts[pos].includes(q));
+  }
+  // 用語名に含まれるものを先に並べる
+  hits.sort((a, b) => index.names[b].includes(q) - index.names[a].includes(q) || a - b);
+  for (const pos of hits.slice(0, 50)) {
+    const [id, name, category, short] = index.terms[pos];
+    const li = document.createElement("li");
+    const a = document.createElement("a");
+    a.href = "terms/" + encodeURIComponent(encodeURIComponent(id)) + ".html";
+    a.textContent = name;
+    li.append(a, "（" + category + "）：" + short);
+    results.append(li);
+  }
+}
+</script>
+"""
+
+
+def render_index_page(store):
+    """一覧ページ（検索欄・カテゴリ別の用語リスト・基本的なワークフロー）の HTML。"""
+    esc = html.escape
+    parts = [
+        "<h1>📚 Git用語ミニ辞典</h1>",
+        '<input type="search" placeholder="用語名・説明・使用例で検索" '
+        'oninput="search(this.value)" style="width: 100%; padding: 0.5rem;">',
+        '<ul id="results"></ul>',
+    ]
+    for category in store.non_empty_categories():
+        terms = store.by_category(category)
+        parts.append(
+            f"<div class='category-header'>{esc(category)}（{len(terms)}件）</div><ul>"
+        )
+        parts.extend(
+            f"<li><a href='{TERMS_DIR}/{_href(t.id)}'>{esc(t.name)}</a>："
+            f"{esc(t.short_description)}</li>"
+            for t in terms
+        )
+        parts.append("</ul>")
+    parts.append("<hr><h4>🔄 基本的なワークフロー</h4>")
+    parts.extend(workflow_step_html(i, step) for i, step in enumerate(WORKFLOW_STEPS, 1))
+    parts.append(
+        "<div class='info-box amber'><p style='margin: 0; font-size: 0.875rem; color: #92400e;'>"
+        "💡 <strong>ヒント：</strong>最初は add / commit / push / pull の4つだけに集中して、"
+        "実際に手を動かしながら覚えるのがおすすめです。</p></div>"
+    )
+    return _document("Git用語辞典", "\n".join(parts), head=_SEARCH_SCRIPT)
+
+
+def _load_manifest(path):
+    try:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if manifest.get("template") != TEMPLATE_HASH:
+        return {}
+    return manifest.get("pages", {})
+
+
+def build_site(corpus, output_dir, jobs=None, force=False):
+    """corpus を output_dir に書き出し、書き直した・飛ばした・消したページ数を返す。"""
+    output_dir = Path(output_dir)
+    terms_dir = output_dir / TERMS_DIR
+    terms_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_dir / MANIFEST_NAME
+    previous = {} if force else _load_manifest(manifest_path)
+
+    pages = {}
+    stale = []
+    for term in corpus.store:
+        context = page_context(corpus, term)
+        digest = context_hash(context)
+        pages[term.id] = digest
+        page = terms_dir / f"{page_name(term.id)}.html"
+        if previous.get(term.id) != digest or not page.exists():
+            stale.append(context)
+
+    jobs = jobs or os.cpu_count() or 1
+    if jobs > 1 and len(stale) > 1:
+        chunk = max(1, len(stale) // (jobs * 4))
+        batches = [(str(terms_dir), stale[i : i + chunk]) for i in range(0, len(stale), chunk)]
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            rendered = sum(executor.map(_write_pages, batches))
+    else:
+        rendered = _write_pages((terms_dir, stale))
+
+    removed = 0
+    for term_id in set(previous) - set(pages):
+        for suffix in (".html", ".json"):
+            path = terms_dir / f"{page_name(term_id)}{suffix}"
+            if path.exists():
+                path.unlink()
+        removed += 1
+
+    _write_atomic(output_dir / "index.html", render_index_page(corpus.store))
+    _write_atomic(
+        output_dir / SEARCH_INDEX_NAME,
+        json.dumps(build_search_index(corpus.store), ensure_ascii=False, separators=(",", ":")),
+    )
+    # 書き出しが終わってから manifest を更新する（途中で止まったら次回書き直す）
+    _write_atomic(
+        manifest_path,
+        json.dumps({"template": TEMPLATE_HASH, "pages": pages}, ensure_ascii=False),
+    )
+    return BuildReport(rendered, len(pages) - rendered, removed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--output", default="site", help="出力ディレクトリ（既定: %(default)s）")
+    parser.add_argument("--locale", default=DEFAULT_LOCALE, help="用語データの言語（既定: %(default)s）")
+    parser.add_argument("--source", help="用語集のファイルまたはディレクトリ（既定: data/<locale>/）")
+    parser.add_argument("--jobs", type=int, help="並列に描画するプロセス数（既定: CPU コア数）")
+    parser.add_argument("--force", action="store_true", help="変わっていないページも書き直す")
+    args = parser.parse_args(argv)
+
+    ingestor = GlossaryIngestor(args.source or default_source(args.locale))
+    ingestor.scan()
+    doc = ingestor.document()
+    corpus = Corpus(TermStore(doc["terms"], doc["categories"]), 1)
+    report = build_site(corpus, args.output, jobs=args.jobs, force=args.force)
+    print(
+        f"{report.rendered} ページを書き出し、{report.skipped} ページは変更なし、"
+        f"{report.removed} ページを削除しました: {args.output}",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""ローカル永続化（SQLite）の共通設定と、記録の持ち主の id。
+
+メモ・クイズの記録の持ち主（user_id）は2種類ある。既定はセッションごとの
+ランダムな id で、その記録は保存せずメモリ上にだけ持つ（セッションが
+終われば誰も開けないので、ディスクには残さない）。利用者が保存用のキーを
+発行したときだけ、キーから決まる id で SQLite に保存する。キーはランダムな
+128 ビットの文字列で、キーを知っている人は誰でも同じ記録を読み書きできる
+（ログインではなく、記録を開くための鍵）。
+"""
+
+import hashlib
+import os
+import re
+import secrets
+import sqlite3
+import uuid
+from pathlib import Path
+
+# メモ・フィードバックなどの保存先（環境変数 GITDICT_STATE_DIR で変更可能）
+STATE_DIR = Path(
+    os.environ.get(
+        "GITDICT_STATE_DIR", Path(__file__).resolve().parent.parent / ".gitdict"
+    )
+)
+
+
+def connect(path):
+    """WAL モードの SQLite 接続を開く。
+
+    複数スレッドから使うため check_same_thread は無効にしている。
+    呼び出し側でロックを取って直列化すること。
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=5000")
+    return conn
+
+
+# 保存する（キーから決まる）持ち主の id の接頭辞
+OWNER_PREFIX = "owner-"
+
+# 保存用のキーの形式（issue_owner_token が発行する）
+_OWNER_TOKEN = re.compile(r"gd-[A-Za-z0-9_-]{22}")
+
+
+def anonymous_user_id():
+    """このセッションだけの（保存しない）持ち主の id。"""
+    return "anon-" + uuid.uuid4().hex
+
+
+def issue_owner_token():
+    """新しい保存用のキーを発行する。"""
+    return "gd-" + secrets.token_urlsafe(16)
+
+
+def user_id_from_token(token):
+    """保存用のキーから持ち主の id を決める（キーそのものはどこにも保存しない）。
+
+    発行した形式でなければ ValueError。推測しやすい文字列を鍵にして、
+    ほかの人と同じ記録を共有してしまわないようにする。
+    """
+    token = token.strip()
+    if not _OWNER_TOKEN.fullmatch(token):
+        raise ValueError("保存用のキーの形式が正しくありません")
+    return OWNER_PREFIX + hashlib.sha256(token.encode("ascii")).hexdigest()
+
+
+def is_persistent(user_id):
+    """user_id の記録を SQLite に保存するか。"""
+    return user_id.startswith(OWNER_PREFIX)
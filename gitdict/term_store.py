@@ -0,0 +1,159 @@
+"""用語ストア。
+
+用語データ（data/<ロケール>/terms.json）を一度だけ読み込み、
+id・カテゴリから O(1) で引けるようにインデックスを張っておく。
+用語は __slots__ 付きの Term に詰め替え、id・カテゴリ名は intern して
+プロセス内で1つの文字列を共有する。
+"""
+
+import hashlib
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+# 用語データはロケール（言語）ごとに data/<ロケール>/ に分けて置く
+DATA_DIR = Path(__file__).resolve().parent.parent / "data"
+DEFAULT_LOCALE = "ja"
+DEFAULT_TERMS_PATH = DATA_DIR / DEFAULT_LOCALE / "terms.json"
+
+# 「コミット (Commit)」のように末尾の括弧内に英語名を書いた用語名
+_NAME_WITH_ALIAS = re.compile(r"^(?P<name>.*?)\s*\((?P<alias>[^()]+)\)\s*$")
+
+REQUIRED_FIELDS = (
+    "id",
+    "name",
+    "category",
+    "short_description",
+    "full_description",
+    "examples",
+    "related_terms",
+)
+
+
+def split_name(name):
+    """用語名を (日本語名, 括弧内の英語名) に分ける。英語名がなければ None。"""
+    match = _NAME_WITH_ALIAS.match(name)
+    if match:
+        return match.group("name"), match.group("alias")
+    return name, None
+
+
+class Term:
+    """1つの用語。セッション間で共有するので読み取り専用として扱うこと。"""
+
+    __slots__ = REQUIRED_FIELDS
+
+    def __init__(
+        self, id, name, category, short_description, full_description, examples, related_terms
+    ):
+        self.id = sys.intern(id)
+        self.name = name
+        self.category = sys.intern(category)
+        self.short_description = short_description
+        self.full_description = full_description
+        self.examples = tuple(examples)
+        self.related_terms = tuple(sys.intern(r) for r in related_terms)
+
+    @classmethod
+    def from_dict(cls, data):
+        missing = [f for f in REQUIRED_FIELDS if f not in data]
+        if missing:
+            raise ValueError(f"用語 {data.get('id')!r} に必須項目がありません: {missing}")
+        return cls(**{f: data[f] for f in REQUIRED_FIELDS})
+
+    def to_dict(self):
+        data = {f: getattr(self, f) for f in REQUIRED_FIELDS}
+        data["examples"] = list(self.examples)
+        data["related_terms"] = list(self.related_terms)
+        return data
+
+    def __repr__(self):
+        return f"Term(id={self.id!r}, name={self.name!r})"
+
+
+class TermStore:
+    """読み取り専用の用語コレクション。"""
+
+    def __init__(self, terms, categories=()):
+        """terms は用語 dict の列、categories は {"name", "advanced"} の列。"""
+        terms = list(terms)
+        categories = list(categories)
+        payload = json.dumps(
+            {"categories": categories, "terms": terms},
+            ensure_ascii=False,
+            sort_keys=True,
+        )
+        self.version = hashlib.sha256(payload.encode("utf-8")).hexdigest()[:12]
+
+        self._terms = tuple(Term.from_dict(t) for t in terms)
+        self._by_id = {}
+        self._positions = {}
+        for pos, term in enumerate(self._terms):
+            if term.id in self._by_id:
+                raise ValueError(f"用語IDが重複しています: {term.id!r}")
+            self._by_id[term.id] = term
+            self._positions[term.id] = pos
+
+        # カテゴリ順は定義ファイルの順序を優先し、未定義のものは出現順で後ろに足す
+        order = [sys.intern(c["name"]) for c in categories]
+        for term in self._terms:
+            if term.category not in order:
+                order.append(term.category)
+        self.categories = tuple(order)
+        self.advanced_categories = frozenset(
+            c["name"] for c in categories if c.get("advanced")
+        )
+
+        grouped = {c: [] for c in self.categories}
+        for term in self._terms:
+            grouped[term.category].append(term)
+        self._by_category = {c: tuple(ts) for c, ts in grouped.items()}
+        self._ids = tuple(self._by_id)
+
+    def __len__(self):
+        return len(self._terms)
+
+    def __iter__(self):
+        return iter(self._terms)
+
+    def __contains__(self, term_id):
+        return term_id in self._by_id
+
+    @property
+    def terms(self):
+        """定義順の用語タプル。"""
+        return self._terms
+
+    def get(self, term_id, default=None):
+        """id から用語を引く。"""
+        return self._by_id.get(term_id, default)
+
+    def position(self, term_id):
+        """id の定義順インデックス（0 始まり）を返す。"""
+        return self._positions[term_id]
+
+    def by_category(self, category):
+        """カテゴリに属する用語を定義順で返す。"""
+        return self._by_category.get(category, ())
+
+    def ids(self):
+        """全用語の id を定義順で返す。"""
+        return self._ids
+
+    def non_empty_categories(self):
+        """用語が1件以上あるカテゴリだけを返す。"""
+        return tuple(c for c in self.categories if self._by_category[c])
+
+
+def load_term_store(path=None):
+    """JSON ファイルから TermStore を組み立てる。
+
+    path を省略すると環境変数 GITDICT_TERMS_PATH（ベンチマーク用など）、
+    それもなければ DEFAULT_TERMS_PATH を読む。
+    """
+    path = path or os.environ.get("GITDICT_TERMS_PATH") or DEFAULT_TERMS_PATH
+    with open(path, encoding="utf-8") as f:
+        doc = json.load(f)
+    return TermStore(doc["terms"], doc.get("categories", ()))
@@ -0,0 +1,71 @@
+"""検索・並べ替え用の文字列の正規化（折りたたみ）。
+
+- NFKC で全角英数字・半角カナなどの互換文字をそろえる
+- casefold で大文字小文字をそろえる
+- カタカナをひらがなにそろえる（「コミット」と「こみっと」を同一視）
+"""
+
+import unicodedata
+from array import array
+
+# ァ(U+30A1)〜ヶ(U+30F6) と ヽヾ を対応するひらがなに写す
+_KATAKANA_TO_HIRAGANA = {
+    code: code - 0x60 for code in list(range(0x30A1, 0x30F7)) + [0x30FD, 0x30FE]
+}
+
+
+def katakana_to_hiragana(text):
+    """カタカナをひらがなに置き換える（ヷ〜ヺ など対応のないものはそのまま）。"""
+    return text.translate(_KATAKANA_TO_HIRAGANA)
+
+
+def fold(text):
+    """検索キー用に正規化した文字列を返す。"""
+    return katakana_to_hiragana(unicodedata.normalize("NFKC", text).casefold())
+
+
+# NFKC で直前の文字と合成されうる文字（半角の濁点・半濁点）
+_HALFWIDTH_MARKS = {"ﾞ", "ﾟ"}
+
+
+def _clusters(text):
+    # 結合文字は直前の文字とまとめて正規化する（NFKC の合成が区切りをまたがないように）
+    start = 0
+    for i in range(1, len(text) + 1):
+        if i == len(text) or not (
+            unicodedata.combining(text[i]) or text[i] in _HALFWIDTH_MARKS
+        ):
+            yield start, i
+            start = i
+
+
+def fold_with_offsets(text):
+    """fold した文字列と、元の文字列への位置の対応を返す。
+
+    NFKC や casefold で長さが変わらない文字列（ほとんどの本文）では対応は
+    恒等なので offsets は None。変わる場合は (starts, ends) の組で、
+    折りたたみ後の i 文字目は元の text[starts[i]:ends[i]] から生じたことを表す。
+    """
+    if text.isascii() or (
+        unicodedata.is_normalized("NFKC", text) and len(text.casefold()) == len(text)
+    ):
+        return fold(text), None
+
+    parts = []
+    starts = array("i")
+    ends = array("i")
+    for start, end in _clusters(text):
+        folded = fold(text[start:end])
+        parts.append(folded)
+        starts.extend([start] * len(folded))
+        ends.extend([end] * len(folded))
+    return "".join(parts), (starts, ends)
+
+
+def original_span(span, offsets):
+    """折りたたみ後の (開始, 終了) を元の文字列上の (開始, 終了) に直す。"""
+    if offsets is None:
+        return span
+    start, end = span
+    starts, ends = offsets
+    return starts[start], ends[end - 1]
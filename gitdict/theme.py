@@ -0,0 +1,103 @@
+"""画面の見た目（アプリと静的サイトで共通の CSS・部品）。"""
+
+import html
+
+CSS = """
+.block-container {
+    max-width: 1600px;
+}
+
+/* 情報ボックス */
+.info-box {
+    padding: 1rem;
+    border-radius: 0.5rem;
+    margin-bottom: 1rem;
+}
+.info-box.blue {
+    background-color: #eff6ff;
+    border: 1px solid #bfdbfe;
+}
+.info-box.green {
+    background-color: #f0fdf4;
+    border: 1px solid #bbf7d0;
+}
+.info-box.purple {
+    background-color: #faf5ff;
+    border: 1px solid #e9d5ff;
+}
+.info-box.amber {
+    background-color: #fffbeb;
+    border: 1px solid #fde68a;
+}
+
+/* タグ */
+.tag {
+    display: inline-block;
+    padding: 0.25rem 0.75rem;
+    background-color: #eff6ff;
+    color: #2563eb;
+    border-radius: 0.25rem;
+    font-size: 0.875rem;
+    margin-bottom: 0.75rem;
+}
+
+/* 検索語の一致箇所 */
+mark {
+    background-color: #fde68a;
+    padding: 0 0.1em;
+    border-radius: 0.2em;
+}
+.hit-snippet {
+    color: #4b5563;
+    font-size: 0.875rem;
+    margin-bottom: 0.5rem;
+}
+
+/* カテゴリーヘッダー */
+.category-header {
+    color: #6b7280;
+    font-size: 0.875rem;
+    font-weight: 600;
+    margin-top: 1.5rem;
+    margin-bottom: 0.5rem;
+}
+
+/* ワークフローステップ */
+.workflow-step {
+    display: flex;
+    gap: 0.75rem;
+    margin-bottom: 0.75rem;
+}
+.step-number {
+    width: 1.5rem;
+    height: 1.5rem;
+    background-color: #dbeafe;
+    color: #2563eb;
+    border-radius: 50%;
+    display: flex;
+    align-items: center;
+    justify-content: center;
+    font-size: 0.875rem;
+    flex-shrink: 0;
+}
+"""
+
+# 基本的なワークフロー（アプリの左カラムと静的サイトのトップで使う）
+WORKFLOW_STEPS = (
+    "ファイルを編集",
+    "変更をステージング（git add）",
+    "コミット（git commit）",
+    "リモートにプッシュ（git push）",
+)
+
+
+def workflow_step_html(number, text):
+    """ワークフローの1ステップ（番号付きの行）の HTML。"""
+    return f"""
+<div class="workflow-step">
+  <div class="step-number">{number}</div>
+  <div style="font-size: 0.875rem; color: #374151; padding-top: 0.125rem;">
+    {html.escape(text)}
+  </div>
+</div>
+"""